@@ -35,6 +35,6 @@ mkdir -p /var/sudoku
 
 cd /opt/app
 
-$VENV/bin/python3 run.py
-
-exit 0
+# serve.py runs gunicorn on the port sandstorm-http-bridge forwards to (5000).
+# exec so the grain's SIGTERM reaches gunicorn and in-flight requests can finish.
+exec $VENV/bin/python3 serve.py
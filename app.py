@@ -1,14 +1,33 @@
 import os
+import re
+import cProfile
+import hashlib
+import io
 import json
-import random
-import copy
-from datetime import datetime
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import groupby
+from types import SimpleNamespace
 from urllib.parse import unquote
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, g, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm.attributes import set_committed_value
 from flask_cors import CORS
 
+import metrics
+from board import BoardState
+from cache import LRUCache
+from codec import board_to_string, decode_board, encode_board
+from storage import GroupCommitWriter, apply_sqlite_pragmas
+
+# The solver, grader, generator, transforms and NumPy batch modules are imported where they are
+# first needed, so serving a page or a saved game never pays for loading them
+
 # Sandstorm Configuration
 def create_sandstorm_app():
     """Create Flask app configured for Sandstorm.io"""
@@ -23,29 +42,81 @@ def create_sandstorm_app():
 
     # Database configuration - Sandstorm apps store data in /var
     db_path = os.path.join(instance_path, 'sudoku_games.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    # SUDOKU_DATABASE_URI points benchmarks and tools at a scratch database
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SUDOKU_DATABASE_URI', f'sqlite:///{db_path}')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-    # Ensure /var directory exists and is writable
+    # Pre-generated puzzle pool - refilled to the high watermark once a
+    # difficulty drops below the low watermark
+    app.config['PUZZLE_POOL_ENABLED'] = os.environ.get('PUZZLE_POOL_ENABLED', '1') == '1'
+    app.config['PUZZLE_POOL_LOW_WATERMARK'] = int(os.environ.get('PUZZLE_POOL_LOW_WATERMARK', 5))
+    app.config['PUZZLE_POOL_HIGH_WATERMARK'] = int(os.environ.get('PUZZLE_POOL_HIGH_WATERMARK', 20))
+
+    # Optional instrumentation: latency/solver metrics at /metrics, and cProfile
+    # dumps for requests slower than PROFILE_SLOW_REQUEST_MS (0 disables profiling)
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '0') == '1'
+    app.config['PROFILE_SLOW_REQUEST_MS'] = int(os.environ.get('PROFILE_SLOW_REQUEST_MS', 0))
+    app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', os.path.join(instance_path, 'profiles'))
+
+    # Batch game saves arriving within this many ms into one transaction (0 disables)
+    app.config['SQLITE_GROUP_COMMIT_MS'] = int(os.environ.get('SQLITE_GROUP_COMMIT_MS', 0))
+
+    # Worker processes for generate_puzzle, so request threads are not held up by
+    # CPU-bound generation (0 generates in the calling thread)
+    app.config['GENERATION_PROCESSES'] = int(os.environ.get('GENERATION_PROCESSES', 0))
+
+    # Threads per process running /api/new-game requests made with "async": true
+    app.config['GENERATION_JOB_THREADS'] = int(os.environ.get('GENERATION_JOB_THREADS', 2))
+
+    # 'dig' generates every puzzle (or takes one from the pool); 'transform' derives it
+    # from a graded seed in seed_corpus.txt without calling the solver
+    app.config['GENERATION_MODE'] = os.environ.get('GENERATION_MODE', 'dig')
+
+    # Serialized game payloads and rendered pages kept per process (0 disables)
+    app.config['RESPONSE_CACHE_SIZE'] = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+
+    # Ensure /var directory exists and is writable (an access check, not a test file,
+    # since this runs on every grain start)
     try:
         os.makedirs(instance_path, exist_ok=True)
-        # Test write permissions
-        test_file = os.path.join(instance_path, '.write_test')
-        with open(test_file, 'w') as f:
-            f.write('test')
-        os.remove(test_file)
-        print(f"Database will be stored at: {db_path}")
+        if not os.access(instance_path, os.W_OK):
+            raise OSError('Permission denied')
+        print(f"Database will be stored at: {app.config['SQLALCHEMY_DATABASE_URI']}")
     except (OSError, IOError) as e:
         print(f"Warning: Cannot write to {instance_path}: {e}")
 
+    init_extensions(app)
     return app
 
+# Extensions are created unbound so models can be declared before there is an app
+db = SQLAlchemy()
+cors = CORS()
+
+def init_extensions(app):
+    """Bind the database, CORS and metrics to an app"""
+    db.init_app(app)
+    cors.init_app(app)
+    metrics.enable(app.config['METRICS_ENABLED'])
+
+    # WAL mode and connection pragmas for every SQLite connection
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            db.event.listen(db.engine, 'connect', apply_sqlite_pragmas)
+
 # Create the app instance
 app = create_sandstorm_app()
 
-# Initialize extensions
-db = SQLAlchemy(app)
-CORS(app)
+group_commit = GroupCommitWriter(app, db, window_ms=app.config['SQLITE_GROUP_COMMIT_MS'])
+
+@db.event.listens_for(db.session, 'before_commit')
+def start_commit_timer(session):
+    session.info['commit_started'] = time.perf_counter()
+
+@db.event.listens_for(db.session, 'after_commit')
+def record_commit_time(session):
+    started = session.info.pop('commit_started', None)
+    if started is not None:
+        metrics.db_commit_seconds.observe(time.perf_counter() - started)
 
 # Sandstorm User Management
 class SandstormUser:
@@ -88,209 +159,425 @@ class SandstormUser:
 
 # Database Models
 class SudokuGame(db.Model):
+    __table_args__ = (
+        # /api/recent-incomplete-game and keyset-paginated /api/games
+        db.Index('ix_sudoku_game_user_complete_updated', 'sandstorm_user_id', 'is_complete', 'updated_at'),
+        db.Index('ix_sudoku_game_user_updated_id', 'sandstorm_user_id', 'updated_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     sandstorm_user_id = db.Column(db.String(100), nullable=False, index=True)  # Sandstorm User ID
     user_handle = db.Column(db.String(200))  # Display name for user
-    board_state = db.Column(db.Text, nullable=False)  # JSON string
-    original_puzzle = db.Column(db.Text, nullable=False)  # JSON string
+    board_state = db.Column(db.Text, nullable=False)  # 81 digit string
+    original_puzzle = db.Column(db.Text, nullable=False)  # 81 digit string
+    solution = db.Column(db.String(81))  # 81 digit string, filled in lazily for older games
     difficulty = db.Column(db.String(20), nullable=False)
     is_complete = db.Column(db.Boolean, default=False)
-    time_spent = db.Column(db.Integer, default=0)  # seconds
+    time_spent = db.Column(db.Integer, default=0)  # seconds, elapsed_ms rounded down
+    last_move_seq = db.Column(db.Integer, default=0)  # last client batch applied by PATCH .../moves
+    score = db.Column(db.Integer)  # grader score of the original puzzle, see grader.py
+    seed_puzzle = db.Column(db.String(81))  # seed_corpus.txt puzzle a transform-mode game was derived from
+    transform = db.Column(db.String(28))  # encoded transform applied to the seed, see transforms.py
+    elapsed_ms = db.Column(db.BigInteger, default=0)  # play time derived from event timestamps
+    last_event_ts = db.Column(db.BigInteger)  # ms of the latest event; NULL while paused or complete
+    event_count = db.Column(db.Integer, default=0)  # n of the latest GameEvent
+    snapshot_n = db.Column(db.Integer, default=0)  # n of the latest snapshot event, 0 for the original puzzle
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
-        """Convert game to dictionary for JSON serialization"""
+    def to_dict(self, compact=False):
+        """
+        Convert game to dictionary for JSON serialization
+        With compact=True boards are left as 81 digit strings
+        """
         return {
             'id': self.id,
             'sandstorm_user_id': self.sandstorm_user_id,
             'user_handle': self.user_handle,
-            'board_state': json.loads(self.board_state),
-            'original_puzzle': json.loads(self.original_puzzle),
+            'board_state': self.board_state if compact else decode_board(self.board_state),
+            'original_puzzle': self.original_puzzle if compact else decode_board(self.original_puzzle),
             'difficulty': self.difficulty,
             'is_complete': self.is_complete,
             'time_spent': self.time_spent,
+            'last_move_seq': self.last_move_seq or 0,
+            'score': self.score,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
 
-# Sudoku Logic Classes (same as before but more compact)
-class SudokuGenerator:
-    def __init__(self):
-        self.grid = [[0 for _ in range(9)] for _ in range(9)]
-
-    def is_valid_move(self, grid, row, col, num):
-        """Check if placing num at (row, col) is valid"""
-        # Check row
-        for x in range(9):
-            if grid[row][x] == num:
-                return False
-
-        # Check column
-        for x in range(9):
-            if grid[x][col] == num:
-                return False
-
-        # Check 3x3 box
-        start_row = row - row % 3
-        start_col = col - col % 3
-        for i in range(3):
-            for j in range(3):
-                if grid[i + start_row][j + start_col] == num:
-                    return False
-
-        return True
-
-    def solve_sudoku(self, grid):
-        """Solve sudoku using backtracking - used for generating complete grids"""
-        for i in range(9):
-            for j in range(9):
-                if grid[i][j] == 0:
-                    numbers = list(range(1, 10))
-                    random.shuffle(numbers)  # Randomize for variety
-                    for num in numbers:
-                        if self.is_valid_move(grid, i, j, num):
-                            grid[i][j] = num
-                            if self.solve_sudoku(grid):
-                                return True
-                            grid[i][j] = 0
-                    return False
-        return True
-
-    def count_solutions(self, grid, max_solutions=2):
-        """
-        Count the number of solutions for a given Sudoku puzzle
-        Returns early if more than max_solutions are found (for efficiency)
+    def get_solution(self):
         """
-        def backtrack_count(board, solutions_found):
-            if solutions_found[0] >= max_solutions:
-                return  # Early termination for efficiency
-
-            # Find next empty cell
-            for i in range(9):
-                for j in range(9):
-                    if board[i][j] == 0:
-                        for num in range(1, 10):
-                            if self.is_valid_move(board, i, j, num):
-                                board[i][j] = num
-                                backtrack_count(board, solutions_found)
-                                board[i][j] = 0
-                        return
-
-            # If we reach here, we found a complete solution
-            solutions_found[0] += 1
-
-        # Make a copy to avoid modifying the original
-        test_grid = [row[:] for row in grid]
-        solutions_found = [0]
-        backtrack_count(test_grid, solutions_found)
-        return solutions_found[0]
-
-    def has_unique_solution(self, grid):
-        """Check if the puzzle has exactly one solution"""
-        return self.count_solutions(grid, max_solutions=2) == 1
-
-    def generate_complete_board(self):
-        """Generate a complete valid Sudoku board"""
-        self.grid = [[0 for _ in range(9)] for _ in range(9)]
-
-        # Fill diagonal 3x3 boxes first (they don't affect each other)
-        for box in range(0, 9, 3):
-            self.fill_box(box, box)
-
-        # Fill remaining cells
-        self.solve_sudoku(self.grid)
-        return copy.deepcopy(self.grid)
-
-    def fill_box(self, row, col):
-        """Fill a 3x3 box with random numbers"""
-        numbers = list(range(1, 10))
-        random.shuffle(numbers)
-        for i in range(3):
-            for j in range(3):
-                self.grid[row + i][col + j] = numbers[i * 3 + j]
-
-    def generate_puzzle(self, difficulty='medium'):
+        Return the solution string, solving the original puzzle once for games created before it was stored.
+        The backfill keeps updated_at, so a hint or check does not count as a change; the caller commits it.
         """
-        Generate a Sudoku puzzle with unique solution using the dig-holes approach
-        """
-        print(f"Generating {difficulty} puzzle with unique solution...")
-
-        # Step 1: Generate complete board
-        complete_board = self.generate_complete_board()
-        puzzle = copy.deepcopy(complete_board)
-
-        # Step 2: Create list of all positions and shuffle
-        positions = [(i, j) for i in range(9) for j in range(9)]
-        random.shuffle(positions)
+        if self.solution:
+            return self.solution
+        solution = None
+        if self.seed_puzzle:
+            solution = get_seed_corpus().rebuild_solution(self.seed_puzzle, self.transform)
+        if not solution:
+            from solver import BitmaskSolver
+            solved = BitmaskSolver(decode_board(self.original_puzzle)).solve()
+            if solved is None:
+                return None
+            solution = board_to_string(solved)
+        db.session.execute(db.update(SudokuGame).where(SudokuGame.id == self.id)
+                           .values(solution=solution, updated_at=SudokuGame.updated_at))
+        set_committed_value(self, 'solution', solution)
+        return solution
+
+class GameEvent(db.Model):
+    """
+    Append-only log of what happened to a game, numbered per game by n.
+    Moves are stored as 3 digits each (cell 00-80, then the value, 0 clearing it)
+    and snapshots as the 81 digit board, so replay never reads more than one
+    snapshot plus the moves logged after it.
+    """
+    __table_args__ = (
+        db.Index('ix_game_event_game_n', 'game_id', 'n', unique=True),
+        # Completed games for /api/analytics/solve-times
+        db.Index('ix_game_event_kind_game', 'kind', 'game_id'),
+    )
 
-        # Step 3: Difficulty parameters
-        difficulty_params = {
-            'easy': {'min_clues': 36, 'max_attempts': 64},
-            'medium': {'min_clues': 30, 'max_attempts': 56}, 
-            'hard': {'min_clues': 25, 'max_attempts': 48}
-        }
-
-        params = difficulty_params.get(difficulty, difficulty_params['medium'])
-        min_clues = params['min_clues']
-        max_attempts = params['max_attempts']
+    id = db.Column(db.Integer, primary_key=True)
+    game_id = db.Column(db.Integer, db.ForeignKey('sudoku_game.id'), nullable=False)
+    n = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.SmallInteger, nullable=False)  # index into EVENT_KINDS
+    ts = db.Column(db.BigInteger, nullable=False)  # server time, ms since epoch
+    data = db.Column(db.Text)
+
+class PooledPuzzle(db.Model):
+    """Pre-generated puzzle waiting to be handed out by /api/new-game"""
+    id = db.Column(db.Integer, primary_key=True)
+    difficulty = db.Column(db.String(20), nullable=False, index=True)
+    puzzle = db.Column(db.Text, nullable=False)  # 81 digit string
+    solution = db.Column(db.Text, nullable=False)  # 81 digit string
+    score = db.Column(db.Integer)  # grader score, computed while the puzzle was dug
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-        # Step 4: Remove numbers while maintaining unique solution
-        removed_positions = []
-        clues_remaining = 81
+class PoolRefillClaim(db.Model):
+    """The process refilling one difficulty of the puzzle pool, so workers never refill it concurrently"""
+    difficulty = db.Column(db.String(20), primary_key=True)
+    holder = db.Column(db.String(40))  # process id of the claimant, NULL when released
+    expires_at = db.Column(db.DateTime, nullable=False)
 
-        for row, col in positions[:max_attempts]:
-            if clues_remaining <= min_clues:
-                break
+class GenerationJob(db.Model):
+    """A new game being generated in the background for an async /api/new-game request"""
+    id = db.Column(db.Integer, primary_key=True)
+    sandstorm_user_id = db.Column(db.String(100), nullable=False, index=True)
+    user_handle = db.Column(db.String(200))
+    difficulty = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, done or failed
+    clues_remaining = db.Column(db.Integer)  # progress of the dig loop while running
+    game_id = db.Column(db.Integer, db.ForeignKey('sudoku_game.id'))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-            # Try removing this number
-            original_value = puzzle[row][col]
-            puzzle[row][col] = 0
+    FINISHED = ('done', 'failed')
 
-            # Check if puzzle still has unique solution
-            if self.has_unique_solution(puzzle):
-                # Good! Keep it removed
-                removed_positions.append((row, col, original_value))
-                clues_remaining -= 1
-                print(f"  Removed cell ({row},{col}), {clues_remaining} clues remaining")
-            else:
-                # Oops! Put it back
-                puzzle[row][col] = original_value
+    def to_dict(self):
+        """Convert job to dictionary for JSON serialization"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'difficulty': self.difficulty,
+            'clues_remaining': self.clues_remaining,
+            'game_id': self.game_id,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
 
-        print(f"  Final puzzle has {clues_remaining} clues")
+class UserStats(db.Model):
+    """
+    Per-user totals kept up to date as games are created and completed, so stats are one
+    primary key lookup instead of a scan of the user's games. Solve times are time_spent at
+    completion; streaks count consecutive UTC days with a game completed in the app.
+    """
+    sandstorm_user_id = db.Column(db.String(100), primary_key=True)
+    games_started = db.Column(db.Integer, nullable=False, default=0)
+    games_completed = db.Column(db.Integer, nullable=False, default=0)
+    easy_completed = db.Column(db.Integer, nullable=False, default=0)
+    easy_seconds = db.Column(db.Integer, nullable=False, default=0)  # summed solve times
+    easy_best = db.Column(db.Integer)  # fastest solve
+    medium_completed = db.Column(db.Integer, nullable=False, default=0)
+    medium_seconds = db.Column(db.Integer, nullable=False, default=0)
+    medium_best = db.Column(db.Integer)
+    hard_completed = db.Column(db.Integer, nullable=False, default=0)
+    hard_seconds = db.Column(db.Integer, nullable=False, default=0)
+    hard_best = db.Column(db.Integer)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)  # days, ending on last_completed_on
+    best_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_completed_on = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-        # Verify the final puzzle has a unique solution
-        if not self.has_unique_solution(puzzle):
-            print("  WARNING: Final puzzle does not have unique solution!")
+    DIFFICULTIES = ('easy', 'medium', 'hard')
+
+    def to_dict(self, today=None):
+        """Convert stats to dictionary for JSON serialization"""
+        today = today or datetime.utcnow().date()
+        # A streak is only current while it could still be extended today
+        streak_alive = self.last_completed_on is not None and (today - self.last_completed_on).days <= 1
+        difficulties = {}
+        for difficulty in self.DIFFICULTIES:
+            completed = getattr(self, f'{difficulty}_completed') or 0
+            difficulties[difficulty] = {
+                'completed': completed,
+                'average_seconds': round(getattr(self, f'{difficulty}_seconds') / completed, 1) if completed else None,
+                'best_seconds': getattr(self, f'{difficulty}_best')
+            }
+        return {
+            'games_started': self.games_started or 0,
+            'games_completed': self.games_completed or 0,
+            'difficulties': difficulties,
+            'current_streak': self.current_streak if streak_alive else 0,
+            'best_streak': self.best_streak or 0,
+            'last_completed_on': self.last_completed_on.isoformat() if self.last_completed_on else None
+        }
 
-        return puzzle, complete_board
+# Game Event Log
+EVENT_KINDS = ('start', 'moves', 'snapshot', 'pause', 'resume', 'complete')
+EVENT_START, EVENT_MOVES, EVENT_SNAPSHOT, EVENT_PAUSE, EVENT_RESUME, EVENT_COMPLETE = range(len(EVENT_KINDS))
+CLOCK_STOPPING_EVENTS = (EVENT_PAUSE, EVENT_COMPLETE)
+
+SNAPSHOT_EVERY = 20  # events between board snapshots, bounding the moves a replay applies
+EVENT_IDLE_MS = 5 * 60 * 1000  # longest gap between two events counted as play time
+
+def now_ms():
+    return int(time.time() * 1000)
+
+def encode_moves(moves):
+    """(cell, value, ...) tuples as 3 digits per move"""
+    return ''.join(f'{move[0]:02d}{move[1]}' for move in moves)
+
+def decode_moves(data):
+    """encode_moves text back into (cell, value) tuples"""
+    return [(int(data[i:i + 2]), ord(data[i + 2]) - 48) for i in range(0, len(data), 3)]
+
+def append_event(game, kind, data=None, ts=None):
+    """
+    Number a new event for the game and advance its clock: the time since the previous
+    event counts as play (capped at EVENT_IDLE_MS) unless that event paused or completed it.
+    Updates the game's event columns and returns the new event's column values as a dict,
+    for the caller to pass to insert_events.
+    """
+    ts = ts or now_ms()
+    if game.last_event_ts is not None:
+        game.elapsed_ms = (game.elapsed_ms or 0) + max(0, min(ts - game.last_event_ts, EVENT_IDLE_MS))
+    game.last_event_ts = None if kind in CLOCK_STOPPING_EVENTS else ts
+    game.time_spent = (game.elapsed_ms or 0) // 1000
+    game.event_count = (game.event_count or 0) + 1
+    if kind == EVENT_SNAPSHOT:
+        game.snapshot_n = game.event_count
+    return {'game_id': game.id, 'n': game.event_count, 'kind': kind, 'ts': ts, 'data': data}
+
+def move_events(game, moves, ts=None):
+    """Events for a batch of moves applied to game.board_state, with a snapshot when one is due"""
+    ts = ts or now_ms()
+    events = [append_event(game, EVENT_MOVES, encode_moves(moves), ts)]
+    if game.event_count - (game.snapshot_n or 0) >= SNAPSHOT_EVERY:
+        events.append(append_event(game, EVENT_SNAPSHOT, game.board_state, ts))
+    return events
+
+def mark_complete(session, game, ts=None):
+    """Flag the game complete, stopping its clock, and count it in the user's stats; returns the complete event"""
+    game.is_complete = True
+    event = append_event(game, EVENT_COMPLETE, ts=ts)
+    record_completions(session, game.sandstorm_user_id, game.difficulty, 1, game.time_spent, game.time_spent,
+                       day=datetime.utcfromtimestamp(event['ts'] / 1000).date())
+    return event
+
+def insert_events(session, events):
+    if events:
+        session.execute(db.insert(GameEvent), events)
+
+def replay_board(game, n):
+    """
+    The board as it was after event n: the latest snapshot at or before n (or the
+    original puzzle) with the moves logged after it applied.
+    Returns (board string, snapshot n, move events applied).
+    """
+    snapshot = db.session.execute(
+        db.select(GameEvent.n, GameEvent.data)
+        .where(GameEvent.game_id == game.id, GameEvent.kind == EVENT_SNAPSHOT, GameEvent.n <= n)
+        .order_by(GameEvent.n.desc()).limit(1)
+    ).first()
+    start, board = (snapshot.n, snapshot.data) if snapshot else (0, game.original_puzzle)
+
+    moves = db.session.execute(
+        db.select(GameEvent.data)
+        .where(GameEvent.game_id == game.id, GameEvent.kind == EVENT_MOVES,
+               GameEvent.n > start, GameEvent.n <= n)
+        .order_by(GameEvent.n)
+    ).scalars().all()
+    cells = list(board)
+    for data in moves:
+        for cell, value in decode_moves(data):
+            cells[cell] = str(value)
+    return ''.join(cells), start, len(moves)
+
+def solve_times(user_id):
+    """
+    Average play time to completion per difficulty, summed from the gaps between
+    the user's logged events (the same rule append_event uses) without reading boards.
+    Returns {difficulty: (games, average ms)}.
+    """
+    completed = (
+        db.select(GameEvent.game_id, db.func.min(GameEvent.n).label('n'))
+        .where(GameEvent.kind == EVENT_COMPLETE)
+        .group_by(GameEvent.game_id)
+        .subquery()
+    )
+    window = {'partition_by': GameEvent.game_id, 'order_by': GameEvent.n}
+    gaps = (
+        db.select(
+            GameEvent.game_id,
+            SudokuGame.difficulty,
+            (GameEvent.ts - db.func.lag(GameEvent.ts).over(**window)).label('gap'),
+            db.func.lag(GameEvent.kind).over(**window).label('prev_kind')
+        )
+        .join(completed, completed.c.game_id == GameEvent.game_id)
+        .join(SudokuGame, SudokuGame.id == GameEvent.game_id)
+        .where(SudokuGame.sandstorm_user_id == user_id, GameEvent.n <= completed.c.n)
+        .subquery()
+    )
+    counted = db.case(
+        (db.or_(gaps.c.prev_kind.is_(None), gaps.c.prev_kind.in_(CLOCK_STOPPING_EVENTS)), 0),
+        else_=db.func.min(db.func.max(gaps.c.gap, 0), EVENT_IDLE_MS)
+    )
+    per_game = (
+        db.select(gaps.c.difficulty, db.func.sum(counted).label('ms'))
+        .group_by(gaps.c.game_id, gaps.c.difficulty)
+        .subquery()
+    )
+    rows = db.session.execute(
+        db.select(per_game.c.difficulty, db.func.count(), db.func.avg(per_game.c.ms))
+        .group_by(per_game.c.difficulty)
+    ).all()
+    return {difficulty: (games, average) for difficulty, games, average in rows}
+
+# User Statistics
+def upsert_stats(session, user_id, values, updates):
+    """
+    Create the user's stats row with values, or apply updates (column -> SQL expression
+    over the existing row) to it, in one statement within the caller's transaction
+    """
+    session.execute(
+        sqlite_insert(UserStats)
+        .values(sandstorm_user_id=user_id, **values)
+        .on_conflict_do_update(index_elements=['sandstorm_user_id'],
+                               set_={**updates, 'updated_at': datetime.utcnow()})
+    )
+
+def record_games_started(session, user_id, count=1):
+    upsert_stats(session, user_id, {'games_started': count},
+                 {'games_started': UserStats.games_started + count})
+
+def record_completions(session, user_id, difficulty, count, seconds, best=None, day=None):
+    """
+    Count completed games (a negative count and seconds take back a completion).
+    best is the fastest of them, and day, if given, advances the daily streak.
+    """
+    values = {'games_completed': count}
+    updates = {'games_completed': UserStats.games_completed + count}
+    if difficulty in UserStats.DIFFICULTIES:
+        completed, total, fastest = (getattr(UserStats, f'{difficulty}_{name}') for name in ('completed', 'seconds', 'best'))
+        values.update({completed.key: count, total.key: seconds, fastest.key: best})
+        updates.update({completed.key: completed + count, total.key: total + seconds})
+        if best is not None:
+            updates[fastest.key] = db.func.min(db.func.coalesce(fastest, best), best)
+    if day is not None:
+        streak = db.case(
+            (UserStats.last_completed_on == day, UserStats.current_streak),
+            (UserStats.last_completed_on == day - timedelta(days=1), UserStats.current_streak + 1),
+            else_=1
+        )
+        values.update({'current_streak': 1, 'best_streak': 1, 'last_completed_on': day})
+        updates.update({'current_streak': streak, 'best_streak': db.func.max(UserStats.best_streak, streak),
+                        'last_completed_on': day})
+    upsert_stats(session, user_id, values, updates)
+
+def rebuild_user_stats(user_id=None, session=None):
+    """
+    Recompute stats from scratch for one user, or everyone, from their games and the
+    days their completed games were completed. Returns the number of users rebuilt.
+    Given a session, the rows are written in the caller's transaction instead of committed.
+    """
+    commit = session is None
+    session = session or db.session
+    games = db.select(
+        SudokuGame.sandstorm_user_id, SudokuGame.difficulty, db.func.count(),
+        db.func.count().filter(SudokuGame.is_complete),
+        db.func.coalesce(db.func.sum(SudokuGame.time_spent).filter(SudokuGame.is_complete), 0),
+        db.func.min(SudokuGame.time_spent).filter(SudokuGame.is_complete)
+    ).group_by(SudokuGame.sandstorm_user_id, SudokuGame.difficulty)
+    days = db.select(
+        SudokuGame.sandstorm_user_id, db.func.date(GameEvent.ts / 1000, 'unixepoch').label('day')
+    ).join(SudokuGame, SudokuGame.id == GameEvent.game_id).where(
+        GameEvent.kind == EVENT_COMPLETE, SudokuGame.is_complete).distinct()
+    if user_id is not None:
+        games = games.where(SudokuGame.sandstorm_user_id == user_id)
+        days = days.where(SudokuGame.sandstorm_user_id == user_id)
+
+    rows = {}
+    for user, difficulty, started, completed, seconds, best in session.execute(games):
+        row = rows.setdefault(user, {'sandstorm_user_id': user, 'games_started': 0, 'games_completed': 0,
+                                     'current_streak': 0, 'best_streak': 0, 'last_completed_on': None})
+        row['games_started'] += started
+        row['games_completed'] += completed
+        if difficulty in UserStats.DIFFICULTIES:
+            row.update({f'{difficulty}_completed': completed, f'{difficulty}_seconds': seconds,
+                        f'{difficulty}_best': best})
+
+    for user, day in session.execute(days.order_by(SudokuGame.sandstorm_user_id, 'day')):
+        row = rows.get(user)
+        if row is None:
+            continue
+        day = datetime.strptime(day, '%Y-%m-%d').date()
+        if row['last_completed_on'] == day - timedelta(days=1):
+            row['current_streak'] += 1
+        else:
+            row['current_streak'] = 1
+        row['best_streak'] = max(row['best_streak'], row['current_streak'])
+        row['last_completed_on'] = day
+
+    delete = db.delete(UserStats)
+    if user_id is not None:
+        delete = delete.where(UserStats.sandstorm_user_id == user_id)
+    session.execute(delete)
+    for difficulty in UserStats.DIFFICULTIES:
+        for row in rows.values():
+            row.setdefault(f'{difficulty}_completed', 0)
+            row.setdefault(f'{difficulty}_seconds', 0)
+            row.setdefault(f'{difficulty}_best', None)
+    if rows:
+        session.execute(db.insert(UserStats), list(rows.values()))
+    if commit:
+        db.session.commit()
+    return len(rows)
 
+# Sudoku Logic Classes (same as before but more compact)
 class SudokuValidator:
     @staticmethod
     def is_valid_sudoku(board):
-        # Check rows
-        for row in board:
-            if not SudokuValidator.is_valid_unit([cell for cell in row if cell != 0]):
-                return False
-
-        # Check columns
-        for col in range(9):
-            column = [board[row][col] for row in range(9) if board[row][col] != 0]
-            if not SudokuValidator.is_valid_unit(column):
-                return False
-
-        # Check 3x3 boxes
-        for box_row in range(3):
-            for box_col in range(3):
-                box = []
-                for i in range(3):
-                    for j in range(3):
-                        cell = board[box_row * 3 + i][box_col * 3 + j]
-                        if cell != 0:
-                            box.append(cell)
-                if not SudokuValidator.is_valid_unit(box):
-                    return False
-
+        """One pass over the cells with a digit bitmask per column and box, and one for the current row"""
+        columns = [0] * 9
+        boxes = [0] * 9
+        for r in range(9):
+            row = board[r]
+            seen = 0
+            band = r // 3 * 3
+            for c in range(9):
+                value = row[c]
+                if value:
+                    bit = 1 << value
+                    box = band + c // 3
+                    if not bit & 0x3FE or (seen | columns[c] | boxes[box]) & bit:
+                        return False
+                    seen |= bit
+                    columns[c] |= bit
+                    boxes[box] |= bit
         return True
 
     @staticmethod
@@ -305,7 +592,401 @@ class SudokuValidator:
                     return False
         return SudokuValidator.is_valid_sudoku(board)
 
+# Puzzle Generation
+class GenerationPool:
+    """Runs generate_puzzle in separate processes so it does not hold the GIL in request threads"""
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+
+    def generate(self, difficulty, progress=None):
+        """
+        Returns (puzzle, solution, grader score) for a difficulty.
+        progress, if given, is called on this thread with the clues remaining as holes are dug.
+        """
+        import generator
+
+        processes = self.app.config['GENERATION_PROCESSES']
+        if not processes:
+            puzzle_generator = generator.SudokuGenerator()
+            puzzle, solution = puzzle_generator.generate_puzzle(difficulty, progress)
+            return puzzle, solution, puzzle_generator.last_grade.score
+
+        executor = self._get_executor(processes)
+        if progress is None:
+            future = executor.submit(generator.generate_puzzle, difficulty, None, metrics.enabled)
+        else:
+            # The worker process reports progress through a manager queue that this thread drains
+            updates = self._get_manager().Queue()
+            future = executor.submit(generator.generate_puzzle, difficulty, updates.put, metrics.enabled)
+            while not future.done():
+                try:
+                    progress(updates.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+
+        # Metrics recorded in the worker process only reach /metrics through this one
+        puzzle, solution, score, recorded = future.result()
+        metrics.merge(recorded)
+        return puzzle, solution, score
+
+    def shutdown(self):
+        """Stop the worker processes, letting queued generations finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=False)
+        if manager is not None:
+            manager.shutdown()
+
+    def _get_executor(self, processes):
+        # Created on first use so it belongs to the serving process, not a pre-fork parent.
+        # forkserver children start clean instead of copying this process's threads and RNG state.
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=processes, mp_context=multiprocessing.get_context('forkserver'))
+        return self._executor
+
+    def _get_manager(self):
+        if self._manager is None:
+            import multiprocessing
+
+            with self._lock:
+                if self._manager is None:
+                    self._manager = multiprocessing.get_context('forkserver').Manager()
+        return self._manager
+
+generation_pool = GenerationPool(app)
+_seed_corpus = None
+
+def get_seed_corpus():
+    """The graded seeds in seed_corpus.txt, read on first use"""
+    global _seed_corpus
+    if _seed_corpus is None:
+        from transforms import SeedCorpus
+        _seed_corpus = SeedCorpus.load()
+    return _seed_corpus
+
+# Puzzle Pool
+class PuzzlePool:
+    """
+    Pre-generated puzzles per difficulty, kept topped up by a background thread.
+    Every worker process runs one, so a refill first claims its difficulty in the database.
+    """
+
+    DIFFICULTIES = ('easy', 'medium', 'hard')
+
+    # A claim not renewed for this long belongs to a process that died, and can be taken over
+    CLAIM_SECONDS = 60
+
+    def __init__(self, app):
+        self.app = app
+        self.hits = {difficulty: 0 for difficulty in self.DIFFICULTIES}
+        self.misses = {difficulty: 0 for difficulty in self.DIFFICULTIES}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def low_watermark(self):
+        return self.app.config['PUZZLE_POOL_LOW_WATERMARK']
+
+    @property
+    def high_watermark(self):
+        return self.app.config['PUZZLE_POOL_HIGH_WATERMARK']
+
+    def start(self):
+        """Start the refill thread (safe to call more than once)"""
+        if not self.app.config['PUZZLE_POOL_ENABLED'] or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='puzzle-pool-refill', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Ask the refill thread to exit after the puzzle it is working on"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def pop(self, difficulty):
+        """
+        Take the oldest pooled puzzle for a difficulty.
+        Returns (puzzle, solution, score) or None when the pool is empty.
+        The removal is part of the caller's transaction, so it is undone on rollback.
+        """
+        if not self.app.config['PUZZLE_POOL_ENABLED'] or difficulty not in self.DIFFICULTIES:
+            return None
+
+        while True:
+            entry = PooledPuzzle.query.filter_by(difficulty=difficulty).order_by(PooledPuzzle.id).first()
+            if entry is None:
+                self._count(self.misses, difficulty)
+                self._wakeup.set()
+                return None
+
+            # Another worker may have claimed the same row - only the one that deletes it wins
+            if PooledPuzzle.query.filter_by(id=entry.id).delete() == 1:
+                self._count(self.hits, difficulty)
+                self._wakeup.set()
+                return decode_board(entry.puzzle), decode_board(entry.solution), entry.score
+
+    def sizes(self):
+        """Number of pooled puzzles per difficulty"""
+        counts = dict(db.session.query(PooledPuzzle.difficulty, db.func.count(PooledPuzzle.id))
+                      .group_by(PooledPuzzle.difficulty).all())
+        return {difficulty: counts.get(difficulty, 0) for difficulty in self.DIFFICULTIES}
+
+    def stats(self):
+        """Pool sizes and hit/miss counters for sizing the watermarks"""
+        sizes = self.sizes()
+        return {
+            difficulty: {
+                'size': sizes[difficulty],
+                'hits': self.hits[difficulty],
+                'misses': self.misses[difficulty]
+            }
+            for difficulty in self.DIFFICULTIES
+        }
+
+    def refill(self):
+        """Top up every difficulty that has dropped below the low watermark and is not being refilled elsewhere"""
+        for difficulty, size in self.sizes().items():
+            if size >= self.low_watermark or not self._claim(difficulty):
+                continue
+            try:
+                # Another process may have finished a refill between the count and the claim
+                size = self.sizes()[difficulty]
+                while size < self.high_watermark and not self._stop.is_set():
+                    puzzle, solution, score = generation_pool.generate(difficulty)
+                    db.session.add(PooledPuzzle(
+                        difficulty=difficulty,
+                        puzzle=board_to_string(puzzle),
+                        solution=board_to_string(solution),
+                        score=score
+                    ))
+                    db.session.commit()
+                    size += 1
+                    if not self._claim(difficulty):
+                        break
+            finally:
+                db.session.rollback()
+                self._release(difficulty)
+
+    def _claim(self, difficulty):
+        """Take or renew this process's claim on refilling a difficulty; False if another process holds it"""
+        now = datetime.utcnow()
+        holder = str(os.getpid())
+        db.session.execute(sqlite_insert(PoolRefillClaim).values(difficulty=difficulty, expires_at=now)
+                           .on_conflict_do_nothing(index_elements=['difficulty']))
+        claimed = db.session.execute(
+            db.update(PoolRefillClaim)
+            .where(PoolRefillClaim.difficulty == difficulty,
+                   db.or_(PoolRefillClaim.holder.is_(None), PoolRefillClaim.holder == holder,
+                          PoolRefillClaim.expires_at < now))
+            .values(holder=holder, expires_at=now + timedelta(seconds=self.CLAIM_SECONDS))
+        ).rowcount == 1
+        db.session.commit()
+        return claimed
+
+    def _release(self, difficulty):
+        db.session.execute(
+            db.update(PoolRefillClaim)
+            .where(PoolRefillClaim.difficulty == difficulty, PoolRefillClaim.holder == str(os.getpid()))
+            .values(holder=None)
+        )
+        db.session.commit()
+
+    def _count(self, counters, difficulty):
+        with self._lock:
+            counters[difficulty] += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    self.refill()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Puzzle pool refill error: {e}")
+                finally:
+                    db.session.remove()
+            self._wakeup.wait(timeout=60)
+
+puzzle_pool = PuzzlePool(app)
+
+# Background Generation Jobs
+# Job state lives in the database so any worker process can report on it
+job_executor = ThreadPoolExecutor(max_workers=app.config['GENERATION_JOB_THREADS'],
+                                  thread_name_prefix='generation-job')
+JOB_PROGRESS_INTERVAL = 0.2  # seconds between progress writes
+JOB_POLL_INTERVAL = 0.25  # seconds between status checks in the event stream
+JOB_STREAM_TIMEOUT = 120
+
+def create_game(user_id, user_handle, difficulty, progress=None):
+    """Derive, take a pooled or generate a puzzle, and store it as a new game for the user"""
+    derived = None
+    if app.config['GENERATION_MODE'] == 'transform':
+        derived = get_seed_corpus().derive(difficulty)
+
+    if derived:
+        from grader import grade
+
+        # Transforms keep the grader level but not its step-order-dependent score, so regrade
+        fields = {
+            'original_puzzle': derived.puzzle,
+            'solution': derived.solution,
+            'score': grade(decode_board(derived.puzzle)).score,
+            'seed_puzzle': derived.seed,
+            'transform': derived.transform
+        }
+    else:
+        # The grade comes from generation; only puzzles pooled before scores were stored need one
+        puzzle, solution, score = puzzle_pool.pop(difficulty) or generation_pool.generate(difficulty, progress)
+        if score is None:
+            from grader import grade
+            score = grade(puzzle).score
+        fields = {
+            'original_puzzle': board_to_string(puzzle),
+            'solution': board_to_string(solution),
+            'score': score
+        }
+
+    game = SudokuGame(
+        sandstorm_user_id=user_id,
+        user_handle=user_handle,
+        board_state=fields['original_puzzle'],
+        difficulty=difficulty,
+        **fields
+    )
+    db.session.add(game)
+    db.session.flush()
+    insert_events(db.session, [append_event(game, EVENT_START)])
+    record_games_started(db.session, user_id)
+    db.session.commit()
+    return game
+
+def run_generation_job(job_id):
+    """Executor task: generate the game for a job, recording progress and the outcome on the job row"""
+    with app.app_context():
+        try:
+            job = db.session.get(GenerationJob, job_id)
+            job.status = 'running'
+            db.session.commit()
+            last_write = 0.0
+
+            def progress(clues_remaining):
+                nonlocal last_write
+                now = time.perf_counter()
+                if now - last_write >= JOB_PROGRESS_INTERVAL:
+                    last_write = now
+                    job.clues_remaining = clues_remaining
+                    db.session.commit()
+
+            game = create_game(job.sandstorm_user_id, job.user_handle, job.difficulty, progress)
+            job.status = 'done'
+            job.game_id = game.id
+            job.clues_remaining = sum(cell != '0' for cell in game.original_puzzle)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            GenerationJob.query.filter_by(id=job_id).update({'status': 'failed', 'error': str(e)})
+            db.session.commit()
+            print(f"Generation job {job_id} failed: {e}")
+        finally:
+            db.session.remove()
+
+def job_payload(job, compact=False):
+    """Job status, plus the new game in the /api/new-game response shape once it is done"""
+    payload = {'success': True, **job.to_dict()}
+    if job.status == 'done':
+        game = db.session.get(SudokuGame, job.game_id)
+        payload.update({
+            'puzzle': game.original_puzzle if compact else decode_board(game.original_puzzle),
+            'score': game.score,
+            'user_handle': job.user_handle
+        })
+    return payload
+
+# Response Caching
+# Game payloads are keyed by (game_id, compact) and versioned by updated_at;
+# pages by everything index.html is rendered from
+game_cache = LRUCache(app.config['RESPONSE_CACHE_SIZE'])
+page_cache = LRUCache(app.config['RESPONSE_CACHE_SIZE'])
+
+def invalidate_game(game_id):
+    """Drop both cached payload formats of a game after it changes"""
+    game_cache.invalidate((game_id, False), (game_id, True))
+
+def conditional_response(build_body, etag=None, last_modified=None, mimetype='application/json'):
+    """
+    Response carrying ETag/Last-Modified validators that becomes a 304 when the client's copy
+    still matches. build_body() only runs for a full response; without an etag one is
+    computed from the body.
+    """
+    response = app.response_class(mimetype=mimetype)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if etag is not None:
+        response.set_etag(etag)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+    response.set_data(build_body())
+    if etag is None:
+        response.add_etag()
+    return response.make_conditional(request)
+
 # Routes with Sandstorm Integration
+def wants_compact():
+    """Clients can ask for boards as 81 digit strings with ?format=compact"""
+    return request.args.get('format') == 'compact'
+
+@app.before_request
+def start_puzzle_pool():
+    """Start refilling the puzzle pool once the app is actually serving requests"""
+    puzzle_pool.start()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if app.config['PROFILE_SLOW_REQUEST_MS']:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def record_request_time(response):
+    elapsed = time.perf_counter() - g.request_started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.http_request_seconds.observe(elapsed, route=route, method=request.method,
+                                         status=str(response.status_code))
+
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        if elapsed * 1000 >= app.config['PROFILE_SLOW_REQUEST_MS']:
+            try:
+                os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+                label = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_')
+                name = f"{datetime.utcnow():%Y%m%dT%H%M%S.%f}-{request.method}-{label}.prof"
+                profiler.dump_stats(os.path.join(app.config['PROFILE_DIR'], name))
+            except OSError as e:
+                print(f"Warning: Cannot write profile: {e}")
+    return response
+
 @app.route('/')
 def index():
     """Main page - shows user info for debugging in development"""
@@ -313,21 +994,26 @@ def index():
     user_handle = SandstormUser.get_preferred_handle(request)
     permissions = SandstormUser.get_permissions(request)
 
-    # Pass user info to template for potential display
-    return render_template('index.html', 
-                         user_id=user_id, 
-                         user_handle=user_handle, 
-                         permissions=permissions)
+    # Pass user info to template for potential display, rendering once per distinct user info
+    key = (user_id, user_handle, tuple(permissions))
+    page = page_cache.get(key)
+    if page is None:
+        page = render_template('index.html',
+                               user_id=user_id,
+                               user_handle=user_handle,
+                               permissions=permissions)
+        page_cache.put(key, page)
+    return conditional_response(lambda: page, mimetype='text/html')
 
 @app.route('/api/user-info', methods=['GET'])
 def get_user_info():
     """API endpoint to get current user information"""
-    return jsonify({
+    return conditional_response(lambda: app.json.dumps({
         'success': True,
         'user_id': SandstormUser.get_user_id(request),
         'user_handle': SandstormUser.get_preferred_handle(request),
         'permissions': SandstormUser.get_permissions(request)
-    })
+    }))
 
 @app.route('/api/new-game', methods=['POST'])
 def new_game():
@@ -339,33 +1025,67 @@ def new_game():
         user_id = SandstormUser.get_user_id(request)
         user_handle = SandstormUser.get_preferred_handle(request)
 
-        # Generate new puzzle
-        generator = SudokuGenerator()
-        puzzle, solution = generator.generate_puzzle(difficulty)
-
-        # Create game record with Sandstorm user ID
-        game = SudokuGame(
-            sandstorm_user_id=user_id,
-            user_handle=user_handle,
-            board_state=json.dumps(puzzle),
-            original_puzzle=json.dumps(puzzle),
-            difficulty=difficulty
-        )
+        # With "async": true, answer with a job to poll instead of holding the request during generation
+        if data.get('async'):
+            job = GenerationJob(sandstorm_user_id=user_id, user_handle=user_handle, difficulty=difficulty)
+            db.session.add(job)
+            db.session.commit()
+            job_executor.submit(run_generation_job, job.id)
+            return jsonify({'success': True, **job.to_dict()}), 202
 
-        db.session.add(game)
-        db.session.commit()
+        game = create_game(user_id, user_handle, difficulty)
 
         return jsonify({
             'success': True,
             'game_id': game.id,
-            'puzzle': puzzle,
+            'puzzle': game.original_puzzle if wants_compact() else decode_board(game.original_puzzle),
             'difficulty': difficulty,
+            'score': game.score,
             'user_handle': user_handle
         })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of an async new-game job; includes the game once it is done"""
+    try:
+        user_id = SandstormUser.get_user_id(request)
+        job = GenerationJob.query.filter_by(id=job_id, sandstorm_user_id=user_id).first()
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify(job_payload(job, wants_compact()))
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """Server-sent events for a job: one event per status or progress change, ending when it finishes"""
+    user_id = SandstormUser.get_user_id(request)
+    if not GenerationJob.query.filter_by(id=job_id, sandstorm_user_id=user_id).count():
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    compact = wants_compact()
+
+    def events():
+        last = None
+        deadline = time.monotonic() + JOB_STREAM_TIMEOUT
+        while True:
+            job = db.session.get(GenerationJob, job_id, populate_existing=True)
+            payload = job_payload(job, compact)
+            # End the read transaction so the next poll sees the job thread's commits
+            db.session.rollback()
+            if payload != last:
+                last = payload
+                yield f"event: {payload['status']}\ndata: {json.dumps(payload)}\n\n"
+            if payload['status'] in GenerationJob.FINISHED or time.monotonic() > deadline:
+                return
+            time.sleep(JOB_POLL_INTERVAL)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/recent-incomplete-game', methods=['GET'])
 def get_recent_incomplete_game():
     """Get the most recently modified incomplete game for the current user"""
@@ -388,7 +1108,7 @@ def get_recent_incomplete_game():
         return jsonify({
             'success': True,
             'has_incomplete_game': True,
-            'game': recent_game.to_dict()
+            'game': recent_game.to_dict(compact=wants_compact())
         })
     
     except Exception as e:
@@ -398,73 +1118,551 @@ def get_recent_incomplete_game():
 def get_game(game_id):
     try:
         user_id = SandstormUser.get_user_id(request)
-        game = SudokuGame.query.filter_by(id=game_id, sandstorm_user_id=user_id).first()
+        # Only updated_at is read up front; the full row is loaded when the payload is not cached
+        updated_at = db.session.execute(
+            db.select(SudokuGame.updated_at)
+            .where(SudokuGame.id == game_id, SudokuGame.sandstorm_user_id == user_id)
+        ).first()
 
-        if not game:
+        if not updated_at:
             return jsonify({'success': False, 'error': 'Game not found'}), 404
+        updated_at = updated_at[0]
+        compact = wants_compact()
 
-        return jsonify({
-            'success': True,
-            'game': game.to_dict()
-        })
+        def build_body():
+            key = (game_id, compact)
+            body = game_cache.get(key, updated_at)
+            if body is None:
+                game = db.session.get(SudokuGame, game_id)
+                body = app.json.dumps({'success': True, 'game': game.to_dict(compact=compact)})
+                game_cache.put(key, body, game.updated_at)
+            return body
+
+        return conditional_response(build_body, f'game-{game_id}-{updated_at.isoformat()}', updated_at)
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/game/<int:game_id>', methods=['PUT'])
 def save_game(game_id):
+    """
+    Save a whole board. A changed board is logged as a snapshot event, and
+    is_complete is only accepted for a full board without conflicts, and a
+    solved board cannot be marked incomplete again. Play time is derived from
+    the event log, so time_spent in the body is ignored.
+    """
     try:
         data = request.get_json()
         user_id = SandstormUser.get_user_id(request)
         user_handle = SandstormUser.get_preferred_handle(request)
+        board_state = encode_board(data['board_state']) if 'board_state' in data else None
+
+        def write(session):
+            row = session.execute(
+                db.select(SudokuGame.id, SudokuGame.sandstorm_user_id, SudokuGame.difficulty, SudokuGame.board_state,
+                          SudokuGame.is_complete, SudokuGame.time_spent, SudokuGame.elapsed_ms,
+                          SudokuGame.last_event_ts, SudokuGame.event_count, SudokuGame.snapshot_n)
+                .where(SudokuGame.id == game_id, SudokuGame.sandstorm_user_id == user_id)
+            ).first()
+            if row is None:
+                return 0
+            game = SimpleNamespace(**row._mapping)
+            events = []
+            if board_state is not None and board_state != game.board_state:
+                game.board_state = board_state
+                events.append(append_event(game, EVENT_SNAPSHOT, board_state))
+            if 'is_complete' in data:
+                if data['is_complete'] and not game.is_complete:
+                    if not BoardState(game.board_state).is_complete():
+                        raise ValueError('Board is not complete')
+                    events.append(mark_complete(session, game))
+                elif not data['is_complete'] and game.is_complete and not BoardState(game.board_state).is_complete():
+                    # A stale client can still report a solved board as incomplete, which is ignored
+                    game.is_complete = False
+
+            # Batched saves run in their own savepoint, so a failure here also undoes
+            # the stats and events written above
+            insert_events(session, events)
+            values = {'user_handle': user_handle, 'updated_at': datetime.utcnow(),
+                      'board_state': game.board_state, 'is_complete': game.is_complete}
+            if events:
+                values.update({column: getattr(game, column) for column in
+                               ('elapsed_ms', 'time_spent', 'last_event_ts', 'event_count', 'snapshot_n')})
+            updated = session.execute(
+                db.update(SudokuGame).where(SudokuGame.id == game_id).values(**values)
+            ).rowcount
+            if row.is_complete and not game.is_complete:
+                # Taking back a completion can change best times and streaks, so recount them
+                rebuild_user_stats(user_id, session)
+            return updated
+
+        # Either batched with other saves or committed on its own
+        if app.config['SQLITE_GROUP_COMMIT_MS']:
+            updated = group_commit.submit(write)
+        else:
+            updated = write(db.session)
+            db.session.commit()
+
+        if not updated:
+            return jsonify({'success': False, 'error': 'Game not found'}), 404
+        invalidate_game(game_id)
+
+        return jsonify({'success': True, 'message': 'Game saved successfully'})
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/game/<int:game_id>/moves', methods=['PATCH'])
+def apply_moves(game_id):
+    """
+    Apply a batch of cell entries instead of re-sending the whole board.
+    Body: {"seq": n, "moves": [[row, col, value, ts], ...], "validate": bool}
+    Batches must arrive with increasing seq; stale or repeated batches, and any batch for
+    a completed game, get a 409. A batch that fills the board correctly completes the game.
+    With validate set, the response also carries the board's validity and conflicts.
+    """
+    try:
+        data = request.get_json()
+        user_id = SandstormUser.get_user_id(request)
 
         game = SudokuGame.query.filter_by(id=game_id, sandstorm_user_id=user_id).first()
 
         if not game:
             return jsonify({'success': False, 'error': 'Game not found'}), 404
+        if game.is_complete:
+            return jsonify({'success': False, 'error': 'Game is complete', 'is_complete': True}), 409
+
+        seq = data.get('seq')
+        if not isinstance(seq, int):
+            return jsonify({'success': False, 'error': 'Sequence number required'}), 400
+
+        last_seq = game.last_move_seq or 0
+        if seq <= last_seq:
+            return jsonify({'success': False, 'error': 'Stale or duplicate move batch', 'seq': last_seq}), 409
+
+        moves = parse_moves(data.get('moves', []))
+        original = game.original_puzzle
+        state = BoardState(game.board_state)
+        for cell, value, ts in moves:
+            if original[cell] != '0':
+                raise ValueError('Cannot change an original number')
+            state.set(cell, value)
+
+        game.board_state = state.to_string()
+        game.last_move_seq = seq
+        game.updated_at = datetime.utcnow()
 
-        # Update game state
-        if 'board_state' in data:
-            game.board_state = json.dumps(data['board_state'])
+        events = move_events(game, moves) if moves else []
+        completed = state.is_complete() and not game.is_complete
+        if completed:
+            events.append(mark_complete(db.session, game))
+        insert_events(db.session, events)
+        db.session.commit()
+        invalidate_game(game.id)
+
+        result = {'success': True, 'seq': seq, 'applied': len(moves), 'completed': completed,
+                  'time_spent': game.time_spent}
+        if data.get('validate'):
+            result.update({
+                'is_valid': state.is_valid(),
+                'is_complete': state.is_complete(),
+                'conflicts': state.conflicts()
+            })
+        return jsonify(result)
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def parse_moves(moves):
+    """Validate [row, col, value, ts] lists (or dicts with those keys) into (cell, value, ts) tuples"""
+    if not isinstance(moves, list):
+        raise ValueError('moves must be a list')
+    parsed = []
+    for move in moves:
+        if isinstance(move, dict):
+            move = (move.get('row'), move.get('col'), move.get('value'), move.get('ts'))
+        if not isinstance(move, (list, tuple)) or len(move) not in (3, 4):
+            raise ValueError('Each move needs row, col and value')
+        row, col, value = move[:3]
+        ts = move[3] if len(move) == 4 else None
+        if not all(isinstance(n, int) for n in (row, col, value)):
+            raise ValueError('Move row, col and value must be integers')
+        if not (0 <= row < 9 and 0 <= col < 9 and 0 <= value <= 9):
+            raise ValueError('Move out of range')
+        parsed.append((row * 9 + col, value, ts if isinstance(ts, int) else None))
+    return parsed
+
+@app.route('/api/game/<int:game_id>/events', methods=['POST'])
+def record_event(game_id):
+    """
+    Pause or resume a game's clock. Body: {"kind": "pause" | "resume"}
+    A completed game's clock stays stopped, so its events get a 409.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        user_id = SandstormUser.get_user_id(request)
 
-        if 'time_spent' in data:
-            game.time_spent = data['time_spent']
+        kind = data.get('kind')
+        if kind not in ('pause', 'resume'):
+            return jsonify({'success': False, 'error': 'Event kind must be pause or resume'}), 400
 
-        if 'is_complete' in data:
-            game.is_complete = data['is_complete']
+        game = SudokuGame.query.filter_by(id=game_id, sandstorm_user_id=user_id).first()
+        if not game:
+            return jsonify({'success': False, 'error': 'Game not found'}), 404
+        if game.is_complete:
+            return jsonify({'success': False, 'error': 'Game is complete', 'is_complete': True}), 409
 
-        # Update user handle in case it changed
-        game.user_handle = user_handle
+        insert_events(db.session, [append_event(game, EVENT_KINDS.index(kind))])
         game.updated_at = datetime.utcnow()
+        db.session.commit()
+        invalidate_game(game.id)
+
+        return jsonify({'success': True, 'n': game.event_count, 'time_spent': game.time_spent})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/game/<int:game_id>/events', methods=['GET'])
+def list_events(game_id):
+    """A game's event log after ?after=n, at most ?limit= events, as [n, kind, ts, data] lists"""
+    try:
+        user_id = SandstormUser.get_user_id(request)
+        after = request.args.get('after', 0, type=int)
+        limit = min(max(request.args.get('limit', 500, type=int), 1), 5000)
+
+        if not db.session.query(SudokuGame.query.filter_by(id=game_id, sandstorm_user_id=user_id).exists()).scalar():
+            return jsonify({'success': False, 'error': 'Game not found'}), 404
+
+        rows = db.session.execute(
+            db.select(GameEvent.n, GameEvent.kind, GameEvent.ts, GameEvent.data)
+            .where(GameEvent.game_id == game_id, GameEvent.n > after)
+            .order_by(GameEvent.n).limit(limit)
+        ).all()
+        return jsonify({
+            'success': True,
+            'events': [[n, EVENT_KINDS[kind], ts, data] for n, kind, ts, data in rows]
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/game/<int:game_id>/replay', methods=['GET'])
+def replay_game(game_id):
+    """The board after event ?n= (default: the latest), rebuilt from the nearest snapshot"""
+    try:
+        user_id = SandstormUser.get_user_id(request)
+        game = SudokuGame.query.filter_by(id=game_id, sandstorm_user_id=user_id).first()
+
+        if not game:
+            return jsonify({'success': False, 'error': 'Game not found'}), 404
+
+        n = request.args.get('n', game.event_count or 0, type=int)
+        board, snapshot, replayed = replay_board(game, n)
+        return jsonify({
+            'success': True,
+            'n': n,
+            'board': board if wants_compact() else decode_board(board),
+            'snapshot': snapshot,
+            'replayed': replayed
+        })
 
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """The user's game counts, solve times per difficulty and streaks, from their UserStats row"""
+    try:
+        user_id = SandstormUser.get_user_id(request)
+        stats = db.session.get(UserStats, user_id) or UserStats(sandstorm_user_id=user_id)
+        return jsonify({'success': True, 'stats': stats.to_dict()})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analytics/solve-times', methods=['GET'])
+def get_solve_times():
+    """Completed games and average solve time per difficulty, from the event log"""
+    try:
+        user_id = SandstormUser.get_user_id(request)
+        return jsonify({
+            'success': True,
+            'difficulties': {
+                difficulty: {'games': games, 'average_seconds': round(average / 1000, 1)}
+                for difficulty, (games, average) in solve_times(user_id).items()
+            }
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/game/<int:game_id>/hint', methods=['GET'])
+def get_hint(game_id):
+    """Reveal the solution for a cell (?row=&col=), or for the first empty or wrong cell"""
+    try:
+        user_id = SandstormUser.get_user_id(request)
+        game = SudokuGame.query.filter_by(id=game_id, sandstorm_user_id=user_id).first()
+
+        if not game:
+            return jsonify({'success': False, 'error': 'Game not found'}), 404
+
+        solution = game.get_solution()
+        if solution is None:
+            return jsonify({'success': False, 'error': 'Puzzle has no solution'}), 400
         db.session.commit()
 
-        return jsonify({'success': True, 'message': 'Game saved successfully'})
+        board = game.board_state
+        row = request.args.get('row', type=int)
+        col = request.args.get('col', type=int)
+
+        if row is None or col is None:
+            index = next((i for i, (value, answer) in enumerate(zip(board, solution)) if value != answer), None)
+            if index is None:
+                return jsonify({'success': True, 'is_solved': True})
+            row, col = divmod(index, 9)
+        elif not (0 <= row < 9 and 0 <= col < 9):
+            return jsonify({'success': False, 'error': 'Cell out of range'}), 400
+
+        index = row * 9 + col
+        return jsonify({
+            'success': True,
+            'row': row,
+            'col': col,
+            'value': int(solution[index]),
+            'is_correct': board[index] == solution[index]
+        })
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/game/<int:game_id>/check', methods=['POST'])
+def check_game(game_id):
+    """Compare a board (or the saved board) against the stored solution"""
+    try:
+        data = request.get_json(silent=True) or {}
+        user_id = SandstormUser.get_user_id(request)
+        game = SudokuGame.query.filter_by(id=game_id, sandstorm_user_id=user_id).first()
+
+        if not game:
+            return jsonify({'success': False, 'error': 'Game not found'}), 404
+
+        solution = game.get_solution()
+        if solution is None:
+            return jsonify({'success': False, 'error': 'Puzzle has no solution'}), 400
+        db.session.commit()
+
+        board = encode_board(data['board']) if 'board' in data else game.board_state
+        wrong_cells = find_wrong_cells(board, solution)
+
+        return jsonify({
+            'success': True,
+            'is_solved': board == solution,
+            'wrong_cells': wrong_cells
+        })
+
+    except (ValueError, KeyError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# /api/games page sizes
+GAMES_PAGE_SIZE = 50
+GAMES_PAGE_SIZE_MAX = 200
+
 @app.route('/api/games', methods=['GET'])
 def get_user_games():
+    """
+    List the user's games, most recently updated first.
+    Paginated by keyset: pass the returned next_cursor as ?cursor= to get the next page.
+    """
     try:
         user_id = SandstormUser.get_user_id(request)
-        games = SudokuGame.query.filter_by(sandstorm_user_id=user_id).order_by(SudokuGame.updated_at.desc()).all()
-
-        games_data = []
-        for game in games:
-            games_data.append({
-                'id': game.id,
-                'difficulty': game.difficulty,
-                'is_complete': game.is_complete,
-                'time_spent': game.time_spent,
-                'user_handle': game.user_handle,
-                'created_at': game.created_at.isoformat(),
-                'updated_at': game.updated_at.isoformat()
-            })
+        limit = min(max(request.args.get('limit', GAMES_PAGE_SIZE, type=int), 1), GAMES_PAGE_SIZE_MAX)
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor = parse_games_cursor(cursor)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+
+        # Summary columns only - the board columns are never loaded for the listing
+        query = db.select(
+            SudokuGame.id, SudokuGame.difficulty, SudokuGame.is_complete, SudokuGame.time_spent,
+            SudokuGame.user_handle, SudokuGame.created_at, SudokuGame.updated_at
+        ).where(SudokuGame.sandstorm_user_id == user_id)
+
+        if cursor:
+            query = query.where(db.tuple_(SudokuGame.updated_at, SudokuGame.id) < cursor)
+
+        rows = db.session.execute(
+            query.order_by(SudokuGame.updated_at.desc(), SudokuGame.id.desc()).limit(limit + 1)
+        ).all()
+
+        # The page is built from exactly these rows, so a digest of them validates it. That costs
+        # the same bounded index range as the page itself, however many games the user has.
+        etag = 'games-' + hashlib.blake2b(repr((limit, rows)).encode(), digest_size=12).hexdigest()
+        last_updated = max((game.updated_at for game in rows), default=None)
+
+        def build_body():
+            games_data = []
+            for game in rows[:limit]:
+                games_data.append({
+                    'id': game.id,
+                    'difficulty': game.difficulty,
+                    'is_complete': game.is_complete,
+                    'time_spent': game.time_spent,
+                    'user_handle': game.user_handle,
+                    'created_at': game.created_at.isoformat(),
+                    'updated_at': game.updated_at.isoformat()
+                })
+
+            next_cursor = None
+            if len(rows) > limit:
+                last = rows[limit - 1]
+                next_cursor = f'{last.updated_at.isoformat()}_{last.id}'
+
+            return app.json.dumps({'success': True, 'games': games_data, 'next_cursor': next_cursor})
+
+        return conditional_response(build_body, etag, last_updated)
 
-        return jsonify({'success': True, 'games': games_data})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def parse_games_cursor(cursor):
+    """Split an /api/games cursor into (updated_at, id); raises ValueError if malformed"""
+    updated_at, game_id = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(updated_at), int(game_id)
+
+# Export and Import
+# One compact game per NDJSON line; boards stay 81 digit strings
+EXPORT_COLUMNS = ('id', 'user_handle', 'difficulty', 'board_state', 'original_puzzle', 'solution',
+                  'is_complete', 'time_spent', 'last_move_seq', 'score', 'seed_puzzle', 'transform',
+                  'created_at', 'updated_at')
+EXPORT_BATCH_SIZE = 1000  # rows fetched from the cursor per partition
+IMPORT_BATCH_SIZE = 1000  # games inserted per transaction
+IMPORT_MAX_ERRORS = 20  # rejected lines reported back in detail
+
+def export_games(user_id):
+    """
+    Yield a user's games as NDJSON text, one partition of lines at a time, oldest first.
+    Rows are streamed from the database cursor, so memory does not grow with the number of games.
+    """
+    query = (db.select(*[getattr(SudokuGame, column) for column in EXPORT_COLUMNS])
+             .where(SudokuGame.sandstorm_user_id == user_id)
+             .order_by(SudokuGame.id)
+             .execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for partition in db.session.execute(query).partitions():
+        lines = []
+        for row in partition:
+            game = row._asdict()
+            game['created_at'] = game['created_at'].isoformat() if game['created_at'] else None
+            game['updated_at'] = game['updated_at'].isoformat() if game['updated_at'] else None
+            game['board_state'] = encode_board(decode_board(game['board_state']))
+            game['original_puzzle'] = encode_board(decode_board(game['original_puzzle']))
+            lines.append(json.dumps(game, separators=(',', ':')) + '\n')
+        yield ''.join(lines)
+
+def parse_import_game(data):
+    """Column values for one exported game; raises ValueError if it is not a valid game"""
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    try:
+        game = {
+            'user_handle': data.get('user_handle'),
+            'difficulty': str(data['difficulty'])[:20],
+            'board_state': encode_board(data['board_state']),
+            'original_puzzle': encode_board(data['original_puzzle']),
+            'solution': encode_board(data['solution']) if data.get('solution') else None,
+            'is_complete': data.get('is_complete', False),
+            'time_spent': int(data.get('time_spent') or 0),
+            'last_move_seq': int(data.get('last_move_seq') or 0),
+            'score': int(data['score']) if data.get('score') is not None else None,
+            'seed_puzzle': encode_board(data['seed_puzzle']) if data.get('seed_puzzle') else None,
+            'transform': data.get('transform') or None
+        }
+        if not isinstance(game['is_complete'], bool):
+            raise ValueError('is_complete must be true or false')
+        if game['transform']:
+            from transforms import decode_transform
+            decode_transform(game['transform'])
+        # Imported games have no event log, so their clock starts from the exported time
+        game['elapsed_ms'] = game['time_spent'] * 1000
+        for column in ('created_at', 'updated_at'):
+            game[column] = datetime.fromisoformat(data[column]) if data.get(column) else datetime.utcnow()
+    except KeyError as e:
+        raise ValueError(f'Missing field {e}')
+    except TypeError as e:
+        raise ValueError(str(e))
+    return game
+
+def import_games(user_id, lines, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Insert games from NDJSON lines for a user, committing every batch_size games.
+    Bad lines are skipped. Returns {'imported': n, 'rejected': n, 'errors': [{'line', 'error'}, ...]}.
+    """
+    result = {'imported': 0, 'rejected': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        db.session.execute(db.insert(SudokuGame), batch)
+        record_games_started(db.session, user_id, len(batch))
+        for difficulty in {game['difficulty'] for game in batch}:
+            times = [game['time_spent'] for game in batch if game['difficulty'] == difficulty and game['is_complete']]
+            if times:
+                record_completions(db.session, user_id, difficulty, len(times), sum(times), min(times))
+        db.session.commit()
+        result['imported'] += len(batch)
+        batch.clear()
+
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            game = parse_import_game(json.loads(line))
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            result['rejected'] += 1
+            if len(result['errors']) < IMPORT_MAX_ERRORS:
+                result['errors'].append({'line': number, 'error': str(e)})
+            continue
+        game['sandstorm_user_id'] = user_id
+        batch.append(game)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return result
+
+@app.route('/api/games/export', methods=['GET'])
+def export_user_games():
+    """Download all of the user's games as NDJSON, streamed from a database cursor"""
+    user_id = SandstormUser.get_user_id(request)
+    return Response(stream_with_context(export_games(user_id)), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': 'attachment; filename=sudoku-games.ndjson'})
+
+@app.route('/api/games/import', methods=['POST'])
+def import_user_games():
+    """Add games from an NDJSON export (request body) to the user's games"""
+    try:
+        user_id = SandstormUser.get_user_id(request)
+        stream = request.stream
+        if isinstance(stream, io.RawIOBase):
+            # Line iteration on a raw stream reads one byte at a time
+            stream = io.BufferedReader(stream)
+        result = import_games(user_id, stream)
+        return jsonify({'success': True, **result})
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/validate', methods=['POST'])
@@ -476,63 +1674,94 @@ def validate_board():
         if not board:
             return jsonify({'success': False, 'error': 'Board data required'}), 400
 
-        is_valid = SudokuValidator.is_valid_sudoku(board)
-        is_complete = SudokuValidator.is_complete(board)
+        # One pass builds the unit counts; validity, completeness and conflicts are read off them
+        state = BoardState(board)
 
-        # Find conflicts for user feedback
-        conflicts = []
-        if not is_valid:
-            conflicts = find_conflicts(board)
+        return jsonify({
+            'success': True,
+            'is_valid': state.is_valid(),
+            'is_complete': state.is_complete(),
+            'conflicts': state.conflicts()
+        })
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/validate/batch', methods=['POST'])
+def validate_batch():
+    """
+    Validate many boards in one request.
+    Body: {"boards": [...]} with 81 digit strings or 9x9 lists.
+    Conflicts come back per board as 81 character strings of 0/1 flags.
+    """
+    try:
+        data = request.get_json()
+        boards = data.get('boards')
+
+        if not isinstance(boards, list):
+            return jsonify({'success': False, 'error': 'Boards list required'}), 400
+
+        from batch import validate_boards
+        result = validate_boards(boards)
+        flags = (result.conflicts.view('uint8') + 48).tobytes().decode('ascii')
 
         return jsonify({
             'success': True,
-            'is_valid': is_valid,
-            'is_complete': is_complete,
-            'conflicts': conflicts
+            'count': len(boards),
+            'is_valid': result.is_valid.tolist(),
+            'is_complete': result.is_complete.tolist(),
+            'conflicts': [flags[i:i + 81] for i in range(0, len(flags), 81)]
         })
 
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def find_wrong_cells(board, solution):
+    """Filled cells of an 81 digit board string that differ from the solution string"""
+    return [
+        {'row': i // 9, 'col': i % 9}
+        for i, (value, answer) in enumerate(zip(board, solution))
+        if value != '0' and value != answer
+    ]
+
 def find_conflicts(board):
     """Find conflicting cells on the Sudoku board"""
-    conflicts = []
-
-    # Check rows for conflicts
-    for row in range(9):
-        seen = {}
-        for col in range(9):
-            if board[row][col] != 0:
-                if board[row][col] in seen:
-                    conflicts.extend([{'row': row, 'col': col}, seen[board[row][col]]])
-                else:
-                    seen[board[row][col]] = {'row': row, 'col': col}
-
-    # Check columns for conflicts  
-    for col in range(9):
-        seen = {}
-        for row in range(9):
-            if board[row][col] != 0:
-                if board[row][col] in seen:
-                    conflicts.extend([{'row': row, 'col': col}, seen[board[row][col]]])
-                else:
-                    seen[board[row][col]] = {'row': row, 'col': col}
-
-    # Check 3x3 boxes for conflicts
-    for box_row in range(3):
-        for box_col in range(3):
-            seen = {}
-            for i in range(3):
-                for j in range(3):
-                    row = box_row * 3 + i
-                    col = box_col * 3 + j
-                    if board[row][col] != 0:
-                        if board[row][col] in seen:
-                            conflicts.extend([{'row': row, 'col': col}, seen[board[row][col]]])
-                        else:
-                            seen[board[row][col]] = {'row': row, 'col': col}
-
-    return conflicts
+    return BoardState(board).conflicts()
+
+@app.route('/api/pool-stats', methods=['GET'])
+def get_pool_stats():
+    """Puzzle pool sizes and hit/miss counters"""
+    try:
+        return jsonify({
+            'success': True,
+            'enabled': app.config['PUZZLE_POOL_ENABLED'],
+            'low_watermark': puzzle_pool.low_watermark,
+            'high_watermark': puzzle_pool.high_watermark,
+            'pool': puzzle_pool.stats()
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Response cache sizes and hit rates for this worker process"""
+    return jsonify({
+        'success': True,
+        'games': game_cache.stats(),
+        'pages': page_cache.stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request latency, generation and solver metrics in Prometheus text format"""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'success': False, 'error': 'Metrics are disabled (set METRICS_ENABLED=1)'}), 404
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 # Debug route for Sandstorm development
 @app.route('/debug/headers')
@@ -546,11 +1775,149 @@ def debug_headers():
         'permissions': SandstormUser.get_permissions(request)
     })
 
+# Columns added since a table was first created: table -> [(column, SQL type)]
+SCHEMA_MIGRATIONS = {
+    'sudoku_game': [('solution', 'VARCHAR(81)'), ('last_move_seq', 'INTEGER DEFAULT 0'), ('score', 'INTEGER'),
+                    ('seed_puzzle', 'VARCHAR(81)'), ('transform', 'VARCHAR(28)'),
+                    ('elapsed_ms', 'BIGINT DEFAULT 0'), ('last_event_ts', 'BIGINT'),
+                    ('event_count', 'INTEGER DEFAULT 0'), ('snapshot_n', 'INTEGER DEFAULT 0')],
+    'pooled_puzzle': [('score', 'INTEGER')]
+}
+
+# Stored in SQLite's PRAGMA user_version once init_db has brought a database up to date.
+# Bump it with every change to a model, an index or SCHEMA_MIGRATIONS.
+SCHEMA_VERSION = 3
+
+def schema_version():
+    """The database's recorded schema version (None where there is no user_version)"""
+    if db.engine.dialect.name != 'sqlite':
+        return None
+    return db.session.execute(db.text('PRAGMA user_version')).scalar()
+
+def init_db():
+    """
+    Bring the database up to SCHEMA_VERSION.
+    A database that is already current skips all DDL and schema inspection.
+    """
+    if schema_version() != SCHEMA_VERSION:
+        migrate_schema()
+
+def fail_interrupted_jobs():
+    """
+    Mark jobs a previous server run was still working on as failed, since they will never finish.
+    Only server startup may call this: the command line tools share the database with a live server.
+    """
+    GenerationJob.query.filter(GenerationJob.status.in_(('pending', 'running'))).update(
+        {'status': 'failed', 'error': 'Interrupted by a restart'})
+    db.session.commit()
+
+def migrate_schema():
+    """Create missing tables and add columns introduced after an existing database was created"""
+    db.create_all()
+
+    inspector = db.inspect(db.engine)
+    for table, columns in SCHEMA_MIGRATIONS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for name, sql_type in columns:
+            if name not in existing:
+                db.session.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {name} {sql_type}'))
+    db.session.commit()
+
+    # create_all only builds indexes for new tables, so add any missing ones to existing tables
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+    migrate_board_encoding()
+    migrate_move_log()
+
+    # Databases from before UserStats existed get their stats built once
+    if not db.session.query(UserStats.query.exists()).scalar() and \
+            db.session.query(SudokuGame.query.exists()).scalar():
+        print(f"Built stats for {rebuild_user_stats()} users")
+
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(db.text(f'PRAGMA user_version = {SCHEMA_VERSION}'))
+        db.session.commit()
+
+def migrate_board_encoding(batch_size=500):
+    """Rewrite boards still stored as JSON lists to 81 digit strings"""
+    for model, columns in ((SudokuGame, ('board_state', 'original_puzzle')),
+                           (PooledPuzzle, ('puzzle', 'solution'))):
+        legacy = db.or_(*[getattr(model, column).like('[%') for column in columns])
+        # updated_at is written back unchanged, so its onupdate does not stamp every game with the migration time
+        kept = ('updated_at',) if hasattr(model, 'updated_at') else ()
+        while True:
+            rows = db.session.execute(
+                db.select(model.id, *[getattr(model, column) for column in columns + kept]).where(legacy).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            db.session.execute(db.update(model), [
+                {'id': row[0],
+                 **{column: encode_board(decode_board(value)) for column, value in zip(columns, row[1:])},
+                 **{column: value for column, value in zip(kept, row[1 + len(columns):])}}
+                for row in rows
+            ])
+            db.session.commit()
+
+def migrate_move_log():
+    """
+    Start the server-side clock of older games from their client-reported time_spent, and
+    turn the per-cell game_move table the event log replaced into move events, followed by
+    a snapshot of the stored board so replay matches it even after whole-board saves.
+    updated_at is written back unchanged so the upgrade does not reorder anyone's games.
+    """
+    db.session.execute(db.update(SudokuGame)
+                       .where(db.func.coalesce(SudokuGame.elapsed_ms, 0) == 0, SudokuGame.time_spent > 0)
+                       .values(elapsed_ms=SudokuGame.time_spent * 1000, updated_at=SudokuGame.updated_at))
+    db.session.commit()
+
+    if not db.inspect(db.engine).has_table('game_move'):
+        return
+    rows = db.session.execute(db.text(
+        'SELECT game_id, seq, cell, value, ts FROM game_move ORDER BY game_id, seq, id')).all()
+    games = {game.id: SimpleNamespace(**game._mapping) for game in db.session.execute(
+        db.select(SudokuGame.id, SudokuGame.board_state, SudokuGame.event_count, SudokuGame.snapshot_n,
+                  SudokuGame.updated_at)
+        .where(SudokuGame.id.in_({row.game_id for row in rows}))
+    )} if rows else {}
+
+    events = []
+    for game_id, game_rows in groupby(rows, key=lambda row: row.game_id):
+        game = games.get(game_id)
+        if game is None:
+            continue
+        last_ts = int(game.updated_at.timestamp() * 1000)
+        for _, batch_rows in groupby(game_rows, key=lambda row: row.seq):
+            batch_rows = list(batch_rows)
+            game.event_count = (game.event_count or 0) + 1
+            last_ts = max((row.ts or 0) for row in batch_rows) or last_ts
+            events.append({
+                'game_id': game.id, 'n': game.event_count, 'kind': EVENT_MOVES, 'ts': last_ts,
+                'data': encode_moves([(row.cell, row.value) for row in batch_rows])
+            })
+        game.event_count += 1
+        game.snapshot_n = game.event_count
+        events.append({'game_id': game.id, 'n': game.event_count, 'kind': EVENT_SNAPSHOT, 'ts': last_ts,
+                       'data': game.board_state})
+    insert_events(db.session, events)
+    if games:
+        db.session.execute(db.update(SudokuGame), [
+            {'id': game.id, 'event_count': game.event_count or 0, 'snapshot_n': game.snapshot_n or 0,
+             'updated_at': game.updated_at}
+            for game in games.values()
+        ])
+    db.session.execute(db.text('DROP TABLE game_move'))
+    db.session.commit()
+    print(f"Moved {len(rows)} logged moves into {len(events)} game events")
+
 if __name__ == '__main__':
     # Create database tables
     with app.app_context():
         try:
-            db.create_all()
+            init_db()
+            fail_interrupted_jobs()
             print("Database initialized successfully!")
             print(f"Database location: {app.config['SQLALCHEMY_DATABASE_URI']}")
         except Exception as e:
@@ -0,0 +1,101 @@
+"""
+Vectorized validation of many boards at once
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from codec import is_board_string
+from solver import UNITS, BitmaskSolver
+
+# (27, 9) cell indices of every unit; rows, columns and boxes each cover all 81 cells once
+UNIT_INDEX = np.array(UNITS, dtype=np.intp)
+DIGITS = np.arange(1, 10, dtype=np.uint8)
+
+# Digit -> bit (0 for empty cells) and popcount lookup tables
+DIGIT_BITS = np.array([0] + [1 << d for d in range(1, 10)], dtype=np.uint16)
+POPCOUNT = np.array([bin(mask).count('1') for mask in range(1 << 10)], dtype=np.uint8)
+
+# Boards are processed in chunks to bound the (chunk, 27, 9, 9) one-hot intermediate
+CHUNK_SIZE = 4096
+
+BatchResult = namedtuple('BatchResult', ['is_valid', 'is_complete', 'conflicts'])
+
+
+def to_array(boards):
+    """
+    Convert boards given as 81 digit strings, flat 81 lists or 9x9 lists to an (N, 81) uint8 array.
+    Raises ValueError for anything that is not a board.
+    """
+    if not len(boards):
+        return np.zeros((0, 81), dtype=np.uint8)
+
+    if all(isinstance(board, str) for board in boards):
+        if not all(is_board_string(board) for board in boards):
+            raise ValueError('Board strings must be 81 digits')
+        return (np.frombuffer(''.join(boards).encode('ascii'), dtype=np.uint8) - 48).reshape(-1, 81)
+
+    try:
+        array = np.asarray(boards).reshape(len(boards), 81)
+    except ValueError:
+        raise ValueError('Boards must be 9x9 or 81 cells')
+    if array.dtype.kind not in 'iu' or array.min() < 0 or array.max() > 9:
+        raise ValueError('Board cells must be digits 0-9')
+    return array.astype(np.uint8)
+
+
+def validate_boards(boards):
+    """
+    Validate N boards at once.
+    Returns a BatchResult of is_valid (N,) and is_complete (N,) bool arrays
+    and conflicts, an (N, 81) bool mask of cells that repeat a digit in some unit.
+    """
+    cells = boards if isinstance(boards, np.ndarray) else to_array(boards)
+    count = len(cells)
+
+    # A unit is valid when the OR of its digit bits has one bit per filled cell
+    units = DIGIT_BITS[cells][:, UNIT_INDEX]  # (N, 27, 9)
+    seen = np.bitwise_or.reduce(units, axis=2)
+    filled = np.count_nonzero(units, axis=2)
+    is_valid = (POPCOUNT[seen] == filled).all(axis=1)
+    is_complete = is_valid & (cells != 0).all(axis=1)
+
+    # Only invalid boards need the per-cell conflict mask
+    conflicts = np.zeros((count, 81), dtype=bool)
+    invalid = np.flatnonzero(~is_valid)
+    for start in range(0, len(invalid), CHUNK_SIZE):
+        rows = invalid[start:start + CHUNK_SIZE]
+        conflicts[rows] = _conflict_mask(cells[rows])
+
+    return BatchResult(is_valid, is_complete, conflicts)
+
+
+def _conflict_mask(cells):
+    """(n, 81) bool mask of cells whose digit is repeated in one of their units"""
+    # (n, 27, 9 cells, 9 digits): does cell k of unit u hold digit d?
+    onehot = cells[:, UNIT_INDEX, None] == DIGITS
+    duplicated = onehot.sum(axis=2) > 1  # (n, 27, 9 digits)
+    in_conflict = (onehot & duplicated[:, :, None, :]).any(axis=3)  # (n, 27, 9 cells)
+
+    # Scatter unit positions back to cells one unit type at a time, so no cell repeats in an index
+    mask = np.zeros((len(cells), 81), dtype=bool)
+    for first in (0, 9, 18):
+        index = UNIT_INDEX[first:first + 9].ravel()
+        mask[:, index] |= in_conflict[:, first:first + 9].reshape(len(cells), 81)
+    return mask
+
+
+def solve_boards(boards):
+    """
+    Solve N boards, returning an (N, 81) uint8 array with all-zero rows for unsolvable boards.
+    The search itself is per board; only input parsing and output are batched.
+    """
+    cells = boards if isinstance(boards, np.ndarray) else to_array(boards)
+    solutions = np.zeros(cells.shape, dtype=np.uint8)
+    solver = BitmaskSolver()
+    for n, board in enumerate(cells.reshape(-1, 9, 9).tolist()):
+        if solver.load(board):
+            solution = solver.solve()
+            if solution is not None:
+                solutions[n] = np.array(solution, dtype=np.uint8).ravel()
+    return solutions
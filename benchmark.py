@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Sudoku benchmarks
+
+    python benchmark.py                              # run everything, print a summary
+    python benchmark.py count_solutions http_games   # run selected benchmarks
+    python benchmark.py --output after.json          # also write results as JSON
+    python benchmark.py --compare before.json after.json
+
+All randomness is seeded and solver benchmarks use the fixed puzzles in
+benchmark_corpus.txt, so two runs on the same machine are comparable.
+Metrics ending in _per_sec are better when higher; everything else is a
+time per operation and better when lower.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import metrics
+from codec import string_to_board
+from generator import SudokuGenerator
+
+SEED = 20240101
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_corpus.txt')
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def measure(func, number=1, repeat=5):
+    """Median seconds per call of func over repeat rounds of number calls"""
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - started) / number)
+    return statistics.median(rounds)
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Fixed benchmark puzzles as {difficulty: [9x9 board, ...]}"""
+    corpus = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                difficulty, puzzle = line.split()
+                corpus.setdefault(difficulty, []).append(string_to_board(puzzle))
+    return corpus
+
+
+def make_boards(count, seed=SEED):
+    """Solved boards with a few random cells blanked or overwritten, so some are invalid"""
+    rng = random.Random(seed)
+    generator = SudokuGenerator(rng=rng)
+    solved = [generator.generate_complete_board() for _ in range(50)]
+
+    boards = []
+    for n in range(count):
+        board = [row[:] for row in solved[n % len(solved)]]
+        for _ in range(rng.randrange(4)):
+            board[rng.randrange(9)][rng.randrange(9)] = rng.randrange(10)
+        boards.append(board)
+    return boards
+
+
+@benchmark
+def generate_complete_board():
+    generator = SudokuGenerator(rng=random.Random(SEED))
+    return {'board_ms': measure(generator.generate_complete_board, number=20) * 1000}
+
+
+@benchmark
+def generate_puzzle():
+    results = {}
+    for difficulty in ('easy', 'medium', 'hard'):
+        generator = SudokuGenerator(rng=random.Random(SEED))
+        results[f'{difficulty}_ms'] = measure(lambda: generator.generate_puzzle(difficulty), number=3) * 1000
+    return results
+
+
+@benchmark
+def solver_backends():
+    """count_solutions with each backend over the corpus, and digging the same puzzles with each"""
+    from generator import SOLVER_BACKENDS
+
+    corpus = load_corpus()
+    results = {}
+    for backend in SOLVER_BACKENDS:
+        generator = SudokuGenerator(backend=backend)
+        for difficulty, puzzles in corpus.items():
+            elapsed = measure(lambda: [generator.count_solutions(p, max_solutions=2) for p in puzzles], repeat=3)
+            results[f'{backend}_{difficulty}_ms'] = elapsed / len(puzzles) * 1000
+        for difficulty in ('easy', 'medium', 'hard'):
+            # Same seed for both backends, so they dig identical boards in identical order
+            generator = SudokuGenerator(rng=random.Random(SEED), backend=backend)
+            results[f'{backend}_generate_{difficulty}_ms'] = measure(
+                lambda: generator.generate_puzzle(difficulty), number=3, repeat=3) * 1000
+    return results
+
+
+@benchmark
+def derive_puzzle():
+    """Transform-mode generation from the seed corpus, for comparison with generate_puzzle"""
+    from transforms import SeedCorpus
+
+    corpus = SeedCorpus.load()
+    rng = random.Random(SEED)
+    return {f'{difficulty}_us': measure(lambda: corpus.derive(difficulty, rng), number=1000) * 1e6
+            for difficulty in ('easy', 'medium', 'hard')}
+
+
+@benchmark
+def difficulty_tiers():
+    """
+    Complete boards dug per puzzle landing in its grader tier: generate_puzzle's graded
+    digging vs. digging by clue count alone and retrying until the grade fits
+    """
+    from grader import BEYOND
+
+    clue_count_params = {'easy': (36, 64), 'medium': (30, 56), 'hard': (25, 48)}
+    results = {}
+    was_enabled = metrics.enabled
+    for difficulty, (min_clues, max_attempts) in clue_count_params.items():
+        generator = SudokuGenerator(rng=random.Random(SEED))
+        low, high = SudokuGenerator.DIFFICULTY_PARAMS[difficulty]['levels']
+        params = {'min_clues': min_clues, 'max_attempts': max_attempts, 'levels': (1, BEYOND)}
+        boards = found = 0
+        while found < 5 and boards < 500:
+            boards += 1
+            found += low <= generator._dig(difficulty, params, None)[2].level <= high
+        results[f'{difficulty}_clue_count_boards'] = boards / max(found, 1)
+
+        metrics.enable()
+        metrics.generation_boards.values.clear()
+        generator = SudokuGenerator(rng=random.Random(SEED))
+        for _ in range(5):
+            generator.generate_puzzle(difficulty)
+        results[f'{difficulty}_graded_boards'] = sum(metrics.generation_boards.values.values()) / 5
+        metrics.enable(was_enabled)
+    return results
+
+
+@benchmark
+def count_solutions():
+    """count_solutions(max_solutions=2) over each corpus difficulty"""
+    generator = SudokuGenerator()
+    results = {}
+    for difficulty, puzzles in load_corpus().items():
+        elapsed = measure(lambda: [generator.count_solutions(p, max_solutions=2) for p in puzzles])
+        results[f'{difficulty}_ms'] = elapsed / len(puzzles) * 1000
+    return results
+
+
+@benchmark
+def validator():
+    """Per-board SudokuValidator and find_conflicts"""
+    from app import SudokuValidator, find_conflicts
+
+    boards = make_boards(1000)
+    results = {}
+    for name, func in (('is_valid_sudoku', SudokuValidator.is_valid_sudoku),
+                       ('is_complete', SudokuValidator.is_complete),
+                       ('find_conflicts', find_conflicts)):
+        elapsed = measure(lambda: [func(board) for board in boards])
+        results[f'{name}_us'] = elapsed / len(boards) * 1e6
+    return results
+
+
+def unit_scan_is_valid(board):
+    """The original per-board check, a list and set per row, column and box, kept as a fixed baseline"""
+    for row in board:
+        filled = [cell for cell in row if cell != 0]
+        if len(filled) != len(set(filled)):
+            return False
+    for col in range(9):
+        filled = [board[row][col] for row in range(9) if board[row][col] != 0]
+        if len(filled) != len(set(filled)):
+            return False
+    for box_row in range(0, 9, 3):
+        for box_col in range(0, 9, 3):
+            filled = [board[r][c] for r in range(box_row, box_row + 3) for c in range(box_col, box_col + 3)
+                      if board[r][c] != 0]
+            if len(filled) != len(set(filled)):
+                return False
+    return True
+
+
+@benchmark
+def batch_validation():
+    """
+    validate_boards on N boards vs. looping the original unit scan (the speedup) and the
+    current SudokuValidator.is_valid_sudoku
+    """
+    from app import SudokuValidator
+    from batch import to_array, validate_boards
+
+    boards = make_boards(10000)
+    array = to_array(boards)
+
+    unit_scan = measure(lambda: [unit_scan_is_valid(board) for board in boards], repeat=3)
+    loop = measure(lambda: [SudokuValidator.is_valid_sudoku(board) for board in boards], repeat=3)
+    vectorized = measure(lambda: validate_boards(array), repeat=3)
+
+    expected = [unit_scan_is_valid(board) for board in boards]
+    assert validate_boards(array).is_valid.tolist() == expected
+    assert [SudokuValidator.is_valid_sudoku(board) for board in boards] == expected
+    return {
+        'unit_scan_boards_per_sec': len(boards) / unit_scan,
+        'loop_boards_per_sec': len(boards) / loop,
+        'vectorized_boards_per_sec': len(boards) / vectorized,
+        'speedup': unit_scan / vectorized,
+        'speedup_vs_loop': loop / vectorized
+    }
+
+
+@benchmark
+def http_games():
+    """End-to-end API calls through the Flask test client against a scratch database"""
+    from app import app, init_db, puzzle_pool
+
+    random.seed(SEED)
+    headers = {'X-Sandstorm-User-Id': 'benchmark-user'}
+    client = app.test_client()
+    with app.app_context():
+        init_db()
+
+    app.config['PUZZLE_POOL_ENABLED'] = False
+    new_game = lambda: client.post('/api/new-game', json={'difficulty': 'medium'}, headers=headers)
+    results = {'new_game_inline_ms': measure(new_game, number=5) * 1000}
+
+    app.config['PUZZLE_POOL_ENABLED'] = True
+    with app.app_context():
+        puzzle_pool.refill()
+    results['new_game_pooled_ms'] = measure(new_game, number=3, repeat=3) * 1000
+    app.config['PUZZLE_POOL_ENABLED'] = False
+    puzzle_pool.stop()
+
+    # Enough games that the listing is not trivially small
+    for _ in range(40):
+        new_game()
+    game = new_game().get_json()
+    url = f"/api/game/{game['game_id']}"
+    board = game['puzzle']
+
+    results['get_game_ms'] = measure(lambda: client.get(url, headers=headers), number=50) * 1000
+    etag = client.get(url, headers=headers).headers['ETag']
+    results['get_game_not_modified_ms'] = measure(
+        lambda: client.get(url, headers={**headers, 'If-None-Match': etag}), number=50) * 1000
+    results['put_game_ms'] = measure(
+        lambda: client.put(url, json={'board_state': board}, headers=headers), number=50) * 1000
+    results['list_games_ms'] = measure(lambda: client.get('/api/games', headers=headers), number=20) * 1000
+    etag = client.get('/api/games', headers=headers).headers['ETag']
+    results['list_games_not_modified_ms'] = measure(
+        lambda: client.get('/api/games', headers={**headers, 'If-None-Match': etag}), number=20) * 1000
+    return results
+
+
+@benchmark
+def save_throughput():
+    """
+    Sustained PUT /api/game/<id> saves from concurrent clients, with and without group commit,
+    plus raw SQLite commit rates with default vs. tuned pragmas
+    """
+    from app import app, init_db
+    from storage import apply_sqlite_pragmas
+
+    threads, duration = 8, 2.0
+    headers = {'X-Sandstorm-User-Id': 'benchmark-user'}
+    with app.app_context():
+        init_db()
+
+    setup = app.test_client()
+    app.config['PUZZLE_POOL_ENABLED'] = False
+    games = [setup.post('/api/new-game', json={'difficulty': 'easy'}, headers=headers).get_json()
+             for _ in range(threads)]
+
+    def saves_per_sec():
+        counts = [0] * threads
+        stop = time.perf_counter() + duration
+
+        def client_loop(n):
+            client = app.test_client()
+            url = f"/api/game/{games[n]['game_id']}"
+            while time.perf_counter() < stop:
+                client.put(url, json={'board_state': games[n]['puzzle']}, headers=headers)
+                counts[n] += 1
+
+        workers = [threading.Thread(target=client_loop, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return sum(counts) / duration
+
+    results = {}
+    app.config['SQLITE_GROUP_COMMIT_MS'] = 0
+    results['saves_per_sec'] = saves_per_sec()
+    app.config['SQLITE_GROUP_COMMIT_MS'] = 5
+    results['group_commit_saves_per_sec'] = saves_per_sec()
+    app.config['SQLITE_GROUP_COMMIT_MS'] = 0
+
+    # One UPDATE + commit at a time, as the old per-keystroke autosave did
+    for label, tuned in (('default', False), ('tuned', True)):
+        path = os.path.join(tempfile.mkdtemp(), 'raw.db')
+        connection = sqlite3.connect(path)
+        if tuned:
+            apply_sqlite_pragmas(connection)
+        connection.execute('CREATE TABLE game (id INTEGER PRIMARY KEY, board TEXT)')
+        connection.execute('INSERT INTO game VALUES (1, ?)', ('0' * 81,))
+        connection.commit()
+        commits = 500
+        started = time.perf_counter()
+        for n in range(commits):
+            connection.execute('UPDATE game SET board = ? WHERE id = 1', (str(n % 10) * 81,))
+            connection.commit()
+        results[f'raw_{label}_commits_per_sec'] = commits / (time.perf_counter() - started)
+        connection.close()
+    return results
+
+
+@benchmark
+def event_log():
+    """Replaying a 200 event game with and without snapshots, and the solve-time analytics query"""
+    import app as sudoku
+    from app import app, db, init_db, SudokuGame
+
+    random.seed(SEED)
+    headers = {'X-Sandstorm-User-Id': 'benchmark-events'}
+    client = app.test_client()
+    with app.app_context():
+        init_db()
+    app.config['PUZZLE_POOL_ENABLED'] = False
+
+    def new_game():
+        game = client.post('/api/new-game', json={'difficulty': 'easy'}, headers=headers).get_json()
+        with app.app_context():
+            row = db.session.get(SudokuGame, game['game_id'])
+            return f"/api/game/{game['game_id']}", row.original_puzzle, row.get_solution()
+
+    results = {}
+    snapshot_every = sudoku.SNAPSHOT_EVERY
+    for label, every in (('snapshots', snapshot_every), ('no_snapshots', 10 ** 9)):
+        sudoku.SNAPSHOT_EVERY = every
+        url, puzzle, _ = new_game()
+        empty = [i for i, ch in enumerate(puzzle) if ch == '0']
+        for seq in range(1, 201):
+            cell = random.choice(empty)
+            client.patch(f'{url}/moves', json={'seq': seq, 'moves': [[cell // 9, cell % 9, random.randint(0, 9)]]},
+                         headers=headers)
+        results[f'replay_{label}_ms'] = measure(
+            lambda: client.get(f'{url}/replay', headers=headers), number=20) * 1000
+    sudoku.SNAPSHOT_EVERY = snapshot_every
+
+    # Games solved one cell per batch, so each has a few dozen logged events
+    for _ in range(20):
+        url, puzzle, solution = new_game()
+        empty = [i for i, ch in enumerate(puzzle) if ch == '0']
+        for seq, cell in enumerate(empty, 1):
+            client.patch(f'{url}/moves', json={'seq': seq, 'moves': [[cell // 9, cell % 9, int(solution[cell])]]},
+                         headers=headers)
+    results['solve_times_ms'] = measure(
+        lambda: client.get('/api/analytics/solve-times', headers=headers), number=20) * 1000
+    return results
+
+
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from app import app, init_db
+imported = time.perf_counter()
+with app.app_context():
+    init_db()
+ready = time.perf_counter()
+app.test_client().get('/api/user-info', headers={'X-Sandstorm-User-Id': 'benchmark-user'})
+print(json.dumps({'import': imported - started, 'init_db': ready - imported,
+                  'first_request': time.perf_counter() - ready,
+                  'solver_loaded': 'solver' in sys.modules or 'generator' in sys.modules}))
+'''
+
+
+@benchmark
+def startup():
+    """
+    A fresh interpreter importing the app, initializing the database and answering its first
+    request, as on a grain cold start: against a new database and one already at SCHEMA_VERSION
+    """
+    import subprocess
+
+    def start(uri):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                env={**os.environ, 'SUDOKU_DATABASE_URI': uri, 'PUZZLE_POOL_ENABLED': '0'}).stdout
+        timings = json.loads(output.splitlines()[-1])
+        timings['total'] = time.perf_counter() - started
+        return timings
+
+    results = {}
+    for label in ('new_db', 'current_db'):
+        runs = []
+        for _ in range(5):
+            if label == 'new_db' or not runs:
+                uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'startup.db')
+                if label == 'current_db':
+                    start(uri)
+            runs.append(start(uri))
+        for key in ('import', 'init_db', 'first_request', 'total'):
+            results[f'{label}_{key}_ms'] = statistics.median(run[key] for run in runs) * 1000
+    if any(run['solver_loaded'] for run in runs):
+        print("Warning: the solver was imported before any puzzle was generated", file=sys.stderr)
+    return results
+
+
+def run(names):
+    results = {}
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = BENCHMARKS[name]()
+    return {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': SEED
+        },
+        'results': results
+    }
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_sec') or metric == 'speedup'
+
+
+def compare(before, after, threshold):
+    """Print metric changes between two result files; returns the list of regressions"""
+    regressions = []
+    for name, metrics in after['results'].items():
+        for metric, new in metrics.items():
+            old = before['results'].get(name, {}).get(metric)
+            if old is None or old == 0:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better(metric) else change
+            flag = 'REGRESSION' if worse > threshold else ''
+            if flag:
+                regressions.append(f'{name}.{metric}')
+            print(f"{name + '.' + metric:<45} {old:>14,.3f} {new:>14,.3f} {change:>+8.1%}  {flag}")
+    return regressions
+
+
+def print_results(report):
+    for name, metrics in report['results'].items():
+        print(name)
+        for metric, value in metrics.items():
+            print(f"  {metric}: {value:,.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sudoku benchmarks')
+    parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='Compare two result files')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown flagged as a regression')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        regressions = compare(before, after, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        return 0
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    report = run(args.benchmarks or list(BENCHMARKS))
+    print_results(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    # Keep the HTTP benchmarks away from the real database and the refill thread
+    os.environ.setdefault('SUDOKU_DATABASE_URI', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db'))
+    os.environ.setdefault('PUZZLE_POOL_ENABLED', '0')
+    sys.exit(main())
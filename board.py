@@ -0,0 +1,90 @@
+"""
+Incrementally tracked board state for validation
+"""
+from codec import encode_board
+from units import BOX_OF, COL_OF, ROW_OF, UNITS
+
+# Unit ids (row, column, box) for every cell, indexing UNITS
+CELL_UNITS = [(ROW_OF[i], 9 + COL_OF[i], 18 + BOX_OF[i]) for i in range(81)]
+
+
+class BoardState:
+    """
+    Board with per-unit digit counts.
+    Every set() updates validity, completeness and the conflict set in O(1),
+    so none of them need a scan of the whole board.
+    """
+
+    def __init__(self, board=None):
+        self.cells = [0] * 81
+        self.counts = [0] * (27 * 10)  # counts[unit * 10 + digit]
+        self.cell_conflicts = [0] * 81  # units in which the cell's digit is duplicated
+        self.conflict_cells = set()
+        self.duplicates = 0  # (unit, digit) pairs seen more than once
+        self.filled = 0
+        if board is not None:
+            for i, ch in enumerate(encode_board(board)):
+                if ch != '0':
+                    self.set(i, ord(ch) - 48)
+
+    def set(self, index, value):
+        """Place value (0 to clear) at a flat cell index"""
+        old = self.cells[index]
+        if old == value:
+            return
+        if old:
+            self._remove(index, old)
+        self.cells[index] = value
+        if value:
+            self._add(index, value)
+
+    def is_valid(self):
+        return self.duplicates == 0
+
+    def is_complete(self):
+        return self.filled == 81 and self.duplicates == 0
+
+    def conflicts(self):
+        """Conflicting cells as a list of {'row', 'col'} dicts"""
+        return [{'row': i // 9, 'col': i % 9} for i in sorted(self.conflict_cells)]
+
+    def to_string(self):
+        return ''.join([str(cell) for cell in self.cells])
+
+    def _add(self, index, value):
+        self.filled += 1
+        for unit in CELL_UNITS[index]:
+            key = unit * 10 + value
+            count = self.counts[key] + 1
+            self.counts[key] = count
+            if count == 2:
+                # The digit just became duplicated: the cell already holding it conflicts too
+                self.duplicates += 1
+                for other in UNITS[unit]:
+                    if other != index and self.cells[other] == value:
+                        self._mark(other, 1)
+            if count >= 2:
+                self._mark(index, 1)
+
+    def _remove(self, index, value):
+        self.filled -= 1
+        for unit in CELL_UNITS[index]:
+            key = unit * 10 + value
+            count = self.counts[key] - 1
+            self.counts[key] = count
+            if count >= 1:
+                self._mark(index, -1)
+            if count == 1:
+                # Only one copy is left, so it no longer conflicts in this unit
+                self.duplicates -= 1
+                for other in UNITS[unit]:
+                    if other != index and self.cells[other] == value:
+                        self._mark(other, -1)
+
+    def _mark(self, index, delta):
+        conflicts = self.cell_conflicts[index] + delta
+        self.cell_conflicts[index] = conflicts
+        if conflicts:
+            self.conflict_cells.add(index)
+        else:
+            self.conflict_cells.discard(index)
@@ -0,0 +1,48 @@
+"""
+Compact board encodings
+
+Boards are stored and optionally sent over the wire as 81 character digit
+strings in row-major order, with 0 for empty cells.
+"""
+import json
+
+_DIGIT_CHARS = {digit: str(digit) for digit in range(10)}
+
+
+def board_to_string(board):
+    """Flatten a 9x9 board to an 81 character digit string (0 for empty cells)"""
+    if not isinstance(board, (list, tuple)) or len(board) != 9 or \
+            any(not isinstance(row, (list, tuple)) or len(row) != 9 for row in board):
+        raise ValueError('Board must be 9x9')
+    try:
+        return ''.join([_DIGIT_CHARS[cell] for row in board for cell in row])
+    except (KeyError, TypeError):
+        raise ValueError('Board cells must be digits 0-9')
+
+
+def string_to_board(value):
+    """Expand an 81 character digit string back to a 9x9 board"""
+    if not is_board_string(value):
+        raise ValueError('Board string must be 81 digits')
+    digits = [ord(ch) - 48 for ch in value]
+    return [digits[r * 9:r * 9 + 9] for r in range(9)]
+
+
+def is_board_string(value):
+    return isinstance(value, str) and len(value) == 81 and value.isascii() and value.isdigit()
+
+
+def encode_board(value):
+    """Normalize a board given as a 9x9 list or an 81 digit string to the string form"""
+    if isinstance(value, str):
+        if not is_board_string(value):
+            raise ValueError('Board string must be 81 digits')
+        return value
+    return board_to_string(value)
+
+
+def decode_board(value):
+    """Decode a stored board, accepting rows still in the legacy JSON list format"""
+    if value.startswith('['):
+        return json.loads(value)
+    return string_to_board(value)
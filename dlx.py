@@ -0,0 +1,252 @@
+"""
+Dancing Links (Algorithm X) exact cover solver engine
+
+A Sudoku is an exact cover problem: every one of the 729 (cell, digit)
+candidates covers four of 324 constraints (the cell is filled, and the digit
+appears once in its row, column and box), and a solution picks 81 candidates
+covering each constraint exactly once.
+"""
+from solver import BOX_OF, COL_OF, DIGITS_OF, ALL_DIGITS, ROW_OF
+
+COLUMNS = 324
+ROOT = 0
+FIRST_NODE = COLUMNS + 1  # header nodes are 0 (root) and 1-324, candidate k owns nodes FIRST_NODE + 4k to + 4k + 3
+
+_template = None
+
+
+def candidate_columns(cell, digit):
+    """The four constraint columns (1-324) covered by placing digit at a flat cell index"""
+    d = digit - 1
+    return (1 + cell,
+            82 + ROW_OF[cell] * 9 + d,
+            163 + COL_OF[cell] * 9 + d,
+            244 + BOX_OF[cell] * 9 + d)
+
+
+def _build_template():
+    """Link arrays for the full matrix with no givens, built once and copied by every solver"""
+    size = FIRST_NODE + 729 * 4
+    left, right, up, down = [0] * size, [0] * size, list(range(size)), list(range(size))
+    column, count = [0] * size, [0] * (COLUMNS + 1)
+
+    # Headers form a circular list through the root
+    for c in range(COLUMNS + 1):
+        left[c] = c - 1 if c else COLUMNS
+        right[c] = c + 1 if c < COLUMNS else ROOT
+
+    for k in range(729):
+        cell, digit = divmod(k, 9)
+        first = FIRST_NODE + k * 4
+        for offset, c in enumerate(candidate_columns(cell, digit + 1)):
+            node = first + offset
+            left[node] = first + (offset - 1) % 4
+            right[node] = first + (offset + 1) % 4
+            # Append to the bottom of column c
+            column[node] = c
+            up[node] = up[c]
+            down[node] = c
+            down[up[c]] = node
+            up[c] = node
+            count[c] += 1
+    return left, right, up, down, column, count
+
+
+class DLXSolver:
+    """
+    Algorithm X over array-based dancing links: nodes are indices into parallel
+    left/right/up/down/column lists instead of objects.
+
+    Givens are covered as a stack. load() only uncovers back to the first given
+    that changed and covers the rest, so a dig loop that removes one clue at a
+    time reuses the matrix instead of rebuilding it.
+    """
+
+    def __init__(self, grid=None):
+        global _template
+        if _template is None:
+            _template = _build_template()
+        self.left, self.right, self.up, self.down, self.column, self.count = (list(a) for a in _template)
+        self.covered = [False] * (COLUMNS + 1)
+        self.givens = []  # candidates selected by load(), in the order they were covered
+        self.cells = [0] * 81  # the givens as flat cell values
+        self.consistent = True
+        self.solution = None
+        self.nodes = 0  # search nodes visited, for instrumentation
+        if grid is not None:
+            self.load(grid)
+
+    def load(self, grid):
+        """
+        Load a 9x9 grid (0 for empty cells).
+        Returns False if the givens already break a Sudoku rule.
+        """
+        consistent = True
+        wanted = []
+        for r in range(9):
+            row = grid[r]
+            for c in range(9):
+                value = row[c]
+                if not value:
+                    continue
+                if value not in DIGITS_OF[ALL_DIGITS]:
+                    consistent = False
+                    continue
+                wanted.append((r * 9 + c) * 9 + value - 1)
+
+        # Uncover back to the first given that is no longer wanted
+        givens = self.givens
+        wanted_set = set(wanted)
+        keep = 0
+        while keep < len(givens) and givens[keep] in wanted_set:
+            keep += 1
+        while len(givens) > keep:
+            self._deselect(givens.pop())
+
+        self.cells = [0] * 81
+        kept = set(givens)
+        for k in wanted:
+            if k in kept:
+                continue
+            if any(self.covered[c] for c in candidate_columns(k // 9, k % 9 + 1)):
+                consistent = False
+                continue
+            self._select(k)
+            givens.append(k)
+        for k in givens:
+            self.cells[k // 9] = k % 9 + 1
+
+        self.solution = None
+        self.nodes = 0
+        self.consistent = consistent
+        return consistent
+
+    def solve(self):
+        """Return one solution as a 9x9 grid, or None if there is none"""
+        if self.consistent and self._search(1, []):
+            return [self.solution[r * 9:r * 9 + 9] for r in range(9)]
+        return None
+
+    def count_solutions(self, max_solutions=2):
+        """Count solutions, stopping as soon as max_solutions are found"""
+        if not self.consistent:
+            return 0
+        return self._search(max_solutions, [])
+
+    def set_cell(self, index, digit):
+        """Change one given (0 empties it), re-covering only the givens covered after it"""
+        cells = self.cells[:]
+        cells[index] = digit
+        return self.load([cells[r * 9:r * 9 + 9] for r in range(9)])
+
+    def has_other_solution(self, index, digit):
+        """
+        Whether a solution puts something other than digit in the empty cell index.
+        digit must be that cell's value in a known solution of the loaded givens; its
+        candidate row is unlinked for the search, so the known solution is never revisited.
+        """
+        if not self.consistent:
+            return False
+        up, down, column, count = self.up, self.down, self.column, self.count
+        node = FIRST_NODE + (index * 9 + digit - 1) * 4
+        for j in range(node, node + 4):
+            down[up[j]] = down[j]
+            up[down[j]] = up[j]
+            count[column[j]] -= 1
+
+        self.nodes = 0
+        self.solution = None
+        found = self._search(1, [])
+
+        for j in range(node + 3, node - 1, -1):
+            count[column[j]] += 1
+            down[up[j]] = j
+            up[down[j]] = j
+        return found > 0
+
+    def _cover(self, c):
+        left, right, up, down, column, count = self.left, self.right, self.up, self.down, self.column, self.count
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        self.covered[c] = True
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                count[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, c):
+        left, right, up, down, column, count = self.left, self.right, self.up, self.down, self.column, self.count
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                count[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+        self.covered[c] = False
+
+    def _select(self, k):
+        node = FIRST_NODE + k * 4
+        for offset in range(4):
+            self._cover(self.column[node + offset])
+
+    def _deselect(self, k):
+        node = FIRST_NODE + k * 4
+        for offset in range(3, -1, -1):
+            self._uncover(self.column[node + offset])
+
+    def _search(self, limit, partial):
+        right, left, down, column, count = self.right, self.left, self.down, self.column, self.count
+        cover, uncover = self._cover, self._uncover
+        self.nodes += 1
+
+        if right[ROOT] == ROOT:
+            # Every constraint is covered: this is a solution
+            if self.solution is None:
+                cells = [0] * 81
+                for k in self.givens + partial:
+                    cells[k // 9] = k % 9 + 1
+                self.solution = cells
+            return 1
+
+        # Branch on the constraint with the fewest candidates left
+        best = c = right[ROOT]
+        size = count[c]
+        while c != ROOT and size > 1:
+            if count[c] < size:
+                best, size = c, count[c]
+            c = right[c]
+        if size == 0:
+            return 0
+
+        cover(best)
+        found = 0
+        r = down[best]
+        while r != best:
+            j = right[r]
+            while j != r:
+                cover(column[j])
+                j = right[j]
+            partial.append((r - FIRST_NODE) // 4)
+
+            found += self._search(limit - found, partial)
+
+            partial.pop()
+            j = left[r]
+            while j != r:
+                uncover(column[j])
+                j = left[j]
+            if found >= limit:
+                break
+            r = down[r]
+        uncover(best)
+        return found
@@ -0,0 +1,226 @@
+"""
+Sudoku puzzle generation
+"""
+import copy
+import logging
+import os
+import random
+import time
+
+import metrics
+from grader import BEYOND, grade
+from dlx import DLXSolver
+from solver import BitmaskSolver
+
+logger = logging.getLogger(__name__)
+
+# Engines count_solutions can use: 'bitmask' (constraint propagation) or 'dlx' (dancing links)
+SOLVER_BACKENDS = ('bitmask', 'dlx')
+
+
+class SudokuGenerator:
+    # Difficulty parameters: levels is the (min, max) grader level of the tier
+    DIFFICULTY_PARAMS = {
+        'easy': {'min_clues': 36, 'max_attempts': 64, 'levels': (1, 1)},
+        'medium': {'min_clues': 26, 'max_attempts': 81, 'levels': (2, 2)},
+        'hard': {'min_clues': 22, 'max_attempts': 81, 'levels': (3, BEYOND)}
+    }
+
+    # Complete boards dug before settling for a puzzle outside the requested tier
+    MAX_BOARDS = 20
+
+    def __init__(self, rng=None, backend=None):
+        self.grid = [[0 for _ in range(9)] for _ in range(9)]
+        # Batch generation passes a seeded random.Random per worker
+        self.rng = rng or random
+        self.last_grade = None  # Grade of the last generated puzzle
+        self.backend = backend or os.environ.get('SOLVER_BACKEND', 'bitmask')
+        if self.backend not in SOLVER_BACKENDS:
+            raise ValueError(f'Unknown solver backend {self.backend!r}')
+        # One DLX matrix for the generator's lifetime: successive dig steps differ by one
+        # given, so each load() only re-covers the givens after the one that changed
+        self._dlx = None
+
+    def is_valid_move(self, grid, row, col, num):
+        """Check if placing num at (row, col) is valid"""
+        # Check row
+        for x in range(9):
+            if grid[row][x] == num:
+                return False
+
+        # Check column
+        for x in range(9):
+            if grid[x][col] == num:
+                return False
+
+        # Check 3x3 box
+        start_row = row - row % 3
+        start_col = col - col % 3
+        for i in range(3):
+            for j in range(3):
+                if grid[i + start_row][j + start_col] == num:
+                    return False
+
+        return True
+
+    def solve_sudoku(self, grid):
+        """Solve sudoku in place with a randomized search - used for generating complete grids"""
+        solver = BitmaskSolver()
+        solution = solver.solve(rng=self.rng) if solver.load(grid) else None
+        if solution is None:
+            return False
+        for i in range(9):
+            grid[i][:] = solution[i]
+        return True
+
+    def count_solutions(self, grid, max_solutions=2):
+        """
+        Count the number of solutions for a given Sudoku puzzle
+        Returns early if more than max_solutions are found (for efficiency)
+        """
+        solver = self._solver()
+        if not solver.load(grid):
+            return 0
+        count = solver.count_solutions(max_solutions)
+        metrics.solver_nodes.observe(solver.nodes)
+        return count
+
+    def _solver(self):
+        """A solver for the configured backend; the DLX one is kept so its matrix is reused"""
+        if self.backend == 'dlx':
+            if self._dlx is None:
+                self._dlx = DLXSolver()
+            return self._dlx
+        return BitmaskSolver()
+
+    def has_unique_solution(self, grid):
+        """Check if the puzzle has exactly one solution"""
+        return self.count_solutions(grid, max_solutions=2) == 1
+
+    def generate_complete_board(self):
+        """Generate a complete valid Sudoku board"""
+        self.grid = [[0 for _ in range(9)] for _ in range(9)]
+
+        # Fill diagonal 3x3 boxes first (they don't affect each other)
+        for box in range(0, 9, 3):
+            self.fill_box(box, box)
+
+        # Fill remaining cells
+        self.solve_sudoku(self.grid)
+        return copy.deepcopy(self.grid)
+
+    def fill_box(self, row, col):
+        """Fill a 3x3 box with random numbers"""
+        numbers = list(range(1, 10))
+        self.rng.shuffle(numbers)
+        for i in range(3):
+            for j in range(3):
+                self.grid[row + i][col + j] = numbers[i * 3 + j]
+
+    def generate_puzzle(self, difficulty='medium', progress=None):
+        """
+        Generate a Sudoku puzzle with unique solution using the dig-holes approach.
+        The puzzle is graded by the human techniques it needs (see grader.py) and
+        boards are dug until one lands in the requested tier.
+        progress, if given, is called with the number of clues remaining as holes are dug.
+        """
+        logger.debug("Generating %s puzzle with unique solution...", difficulty)
+
+        params = self.DIFFICULTY_PARAMS.get(difficulty, self.DIFFICULTY_PARAMS['medium'])
+        min_level = params['levels'][0]
+
+        for boards in range(1, self.MAX_BOARDS + 1):
+            puzzle, complete_board, grade = self._dig(difficulty, params, progress)
+            if grade.level >= min_level:
+                break
+            logger.debug("  Board graded %s (level %d), below the %s tier; digging a new one",
+                         grade.technique, grade.level, difficulty)
+        else:
+            logger.warning("No %s puzzle after %d boards, using a level %d one", difficulty, boards, grade.level)
+
+        metrics.generation_boards.inc(boards, difficulty=difficulty)
+        self.last_grade = grade
+        return puzzle, complete_board
+
+    def _dig(self, difficulty, params, progress):
+        """
+        Remove clues from a new complete board while the solution stays unique and the
+        puzzle needs no technique above the tier's maximum. Returns (puzzle, board, grade).
+
+        The solution is known all along (it is the complete board), so a removal only needs a
+        search for a solution with a different digit in that cell. One solver follows the
+        puzzle from hole to hole instead of reloading it for every check.
+        """
+        # Step 1: Generate complete board
+        started = time.perf_counter()
+        complete_board = self.generate_complete_board()
+        puzzle = copy.deepcopy(complete_board)
+        metrics.generation_stage_seconds.observe(time.perf_counter() - started, stage='complete_board')
+        started = time.perf_counter()
+
+        # Step 2: Create list of all positions and shuffle
+        positions = [(i, j) for i in range(9) for j in range(9)]
+        self.rng.shuffle(positions)
+
+        min_clues = params['min_clues']
+        max_attempts = params['max_attempts']
+        max_level = params['levels'][1]
+        capped = max_level < BEYOND
+
+        # Step 3: Remove numbers while maintaining unique solution and the tier
+        removed_positions = []
+        clues_remaining = 81
+        attempts = 0
+        solver = self._solver()
+        solver.load(complete_board)
+
+        for row, col in positions[:max_attempts]:
+            if clues_remaining <= min_clues:
+                break
+            attempts += 1
+
+            # Try removing this number
+            original_value = puzzle[row][col]
+            puzzle[row][col] = 0
+            index = row * 9 + col
+            solver.set_cell(index, 0)
+            unique = not solver.has_other_solution(index, original_value)
+            metrics.solver_nodes.observe(solver.nodes)
+
+            # Keep it removed only if the solution is still unique and, for capped tiers,
+            # the grader gets through without a harder technique (it gives up at the first one)
+            if unique and (not capped or grade(puzzle, max_level).solved):
+                removed_positions.append((row, col, original_value))
+                clues_remaining -= 1
+                logger.debug("  Removed cell (%d,%d), %d clues remaining", row, col, clues_remaining)
+                if progress is not None:
+                    progress(clues_remaining)
+            else:
+                # Oops! Put it back
+                puzzle[row][col] = original_value
+                solver.set_cell(index, original_value)
+
+        result = grade(puzzle)
+        logger.info("Dug %s puzzle with %d clues, graded %s (level %d, score %d)",
+                    difficulty, clues_remaining, result.technique, result.level, result.score)
+        metrics.holes_attempted.inc(attempts, difficulty=difficulty)
+        metrics.holes_kept.inc(len(removed_positions), difficulty=difficulty)
+        metrics.generation_stage_seconds.observe(time.perf_counter() - started, stage='dig')
+
+        # Verify the final puzzle has a unique solution
+        if not self.has_unique_solution(puzzle):
+            logger.warning("Final puzzle does not have unique solution!")
+
+        return puzzle, complete_board, result
+
+def generate_puzzle(difficulty='medium', progress=None, record_metrics=False):
+    """
+    Generate one puzzle with a fresh generator; a picklable task for process pools only,
+    since it takes over the calling process's metrics registry. Returns (puzzle, solution,
+    grader score, recorded metrics): a worker process does not share the parent's registry,
+    so with record_metrics its metrics come back for metrics.merge().
+    """
+    metrics.enable(record_metrics)
+    generator = SudokuGenerator()
+    puzzle, solution = generator.generate_puzzle(difficulty, progress)
+    return puzzle, solution, generator.last_grade.score, metrics.drain()
@@ -0,0 +1,228 @@
+"""
+Difficulty grading by the human solving techniques a puzzle needs
+"""
+from collections import namedtuple
+from itertools import combinations
+
+from solver import ALL_DIGITS, BOX_OF, COL_OF, DIGIT_OF_BIT, DIGITS_OF, POPCOUNT, ROW_OF, UNITS
+
+# (name, level, weight) from easiest to hardest. The grader always retries the
+# easiest technique first, so a puzzle's level is the hardest technique it cannot avoid
+# and its score is the summed weight of every step.
+TECHNIQUES = (
+    ('hidden_single', 1, 1),
+    ('naked_single', 1, 2),
+    ('pointing', 2, 4),
+    ('box_line', 2, 4),
+    ('naked_pair', 2, 6),
+    ('hidden_pair', 2, 8),
+    ('naked_triple', 3, 12),
+    ('x_wing', 3, 16),
+)
+
+# Puzzles the techniques above cannot finish need trial and error
+BEYOND = 4
+BEYOND_WEIGHT = 50
+
+LEVEL_NAMES = {1: 'singles', 2: 'pairs and intersections', 3: 'triples and X-wings', BEYOND: 'trial and error'}
+
+Grade = namedtuple('Grade', ['level', 'score', 'technique', 'solved'])
+
+PEERS = [sorted({j for unit in UNITS if i in unit for j in unit} - {i}) for i in range(81)]
+ROWS, COLS, BOXES = UNITS[:9], UNITS[9:18], UNITS[18:]
+
+
+class LogicalSolver:
+    """Solves with candidate eliminations only, recording which techniques it needed"""
+
+    def __init__(self, board):
+        self.values = [0] * 81
+        self.cands = [ALL_DIGITS] * 81
+        self.broken = False
+        for i in range(81):
+            value = board[i // 9][i % 9]
+            if value:
+                if not self.cands[i] & (1 << value):
+                    self.broken = True
+                    continue
+                self._place(i, value)
+
+    def grade(self, max_level=None):
+        """
+        Solve step by step and return a Grade.
+        Stops early, with level max_level + 1, as soon as a step needs a technique above max_level.
+        """
+        steps = [(getattr(self, '_' + name), name, level, weight) for name, level, weight in TECHNIQUES]
+        hardest, hardest_name, score = 0, None, 0
+
+        while not self.broken and 0 in self.values:
+            for step, name, level, weight in steps:
+                if max_level is not None and level > max_level:
+                    return Grade(level, score, name, False)
+                applied = step()
+                if applied:
+                    score += weight * applied
+                    if level > hardest:
+                        hardest, hardest_name = level, name
+                    break
+            else:
+                return Grade(BEYOND, score + BEYOND_WEIGHT, 'beyond', False)
+
+        if self.broken:
+            return Grade(BEYOND, score, 'invalid', False)
+        return Grade(hardest, score, hardest_name, True)
+
+    def _place(self, index, digit):
+        bit = 1 << digit
+        self.values[index] = digit
+        self.cands[index] = 0
+        cands = self.cands
+        for peer in PEERS[index]:
+            if cands[peer] & bit:
+                cands[peer] ^= bit
+                if not cands[peer]:
+                    self.broken = True
+
+    def _eliminate(self, cells, mask):
+        """Remove mask from the candidates of cells; returns how many cells changed"""
+        changed = 0
+        cands = self.cands
+        for i in cells:
+            if cands[i] & mask:
+                cands[i] &= ~mask
+                changed += 1
+                if not cands[i]:
+                    self.broken = True
+        return changed
+
+    # Techniques: each returns how many times it was applied (0 when it found nothing)
+
+    def _hidden_single(self):
+        placed = 0
+        cands = self.cands
+        for unit in UNITS:
+            once = twice = 0
+            for i in unit:
+                twice |= once & cands[i]
+                once |= cands[i]
+            hidden = once & ~twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if cands[i] & bit:
+                        self._place(i, DIGIT_OF_BIT[bit])
+                        placed += 1
+                        break
+        return placed
+
+    def _naked_single(self):
+        placed = 0
+        cands = self.cands
+        for i in range(81):
+            if cands[i] and POPCOUNT[cands[i]] == 1:
+                self._place(i, DIGIT_OF_BIT[cands[i]])
+                placed += 1
+        return placed
+
+    def _pointing(self):
+        """A digit confined to one row or column inside a box is removed from the rest of that line"""
+        cands = self.cands
+        for box in BOXES:
+            for digit in DIGITS_OF[ALL_DIGITS]:
+                bit = 1 << digit
+                cells = [i for i in box if cands[i] & bit]
+                if len(cells) < 2:
+                    continue
+                for line_of, lines in ((ROW_OF, ROWS), (COL_OF, COLS)):
+                    line = line_of[cells[0]]
+                    if all(line_of[i] == line for i in cells):
+                        if self._eliminate([i for i in lines[line] if i not in box], bit):
+                            return 1
+        return 0
+
+    def _box_line(self):
+        """A digit confined to one box inside a row or column is removed from the rest of that box"""
+        cands = self.cands
+        for line in ROWS + COLS:
+            for digit in DIGITS_OF[ALL_DIGITS]:
+                bit = 1 << digit
+                cells = [i for i in line if cands[i] & bit]
+                if len(cells) < 2:
+                    continue
+                box = BOX_OF[cells[0]]
+                if all(BOX_OF[i] == box for i in cells):
+                    if self._eliminate([i for i in BOXES[box] if i not in line], bit):
+                        return 1
+        return 0
+
+    def _naked_pair(self):
+        cands = self.cands
+        for unit in UNITS:
+            pairs = [i for i in unit if POPCOUNT[cands[i]] == 2]
+            for a, b in combinations(pairs, 2):
+                if cands[a] == cands[b]:
+                    if self._eliminate([i for i in unit if i != a and i != b], cands[a]):
+                        return 1
+        return 0
+
+    def _hidden_pair(self):
+        cands = self.cands
+        for unit in UNITS:
+            # Unit positions of each digit as a 9-bit mask
+            positions = {}
+            for digit in DIGITS_OF[ALL_DIGITS]:
+                bit = 1 << digit
+                where = 0
+                for k, i in enumerate(unit):
+                    if cands[i] & bit:
+                        where |= 1 << k
+                if bin(where).count('1') == 2:
+                    positions.setdefault(where, []).append(digit)
+            for where, digits in positions.items():
+                if len(digits) == 2:
+                    keep = (1 << digits[0]) | (1 << digits[1])
+                    cells = [unit[k] for k in range(9) if where & (1 << k)]
+                    if self._eliminate(cells, ALL_DIGITS & ~keep):
+                        return 1
+        return 0
+
+    def _naked_triple(self):
+        cands = self.cands
+        for unit in UNITS:
+            small = [i for i in unit if 2 <= POPCOUNT[cands[i]] <= 3]
+            for trio in combinations(small, 3):
+                mask = cands[trio[0]] | cands[trio[1]] | cands[trio[2]]
+                if POPCOUNT[mask] == 3:
+                    if self._eliminate([i for i in unit if i not in trio], mask):
+                        return 1
+        return 0
+
+    def _x_wing(self):
+        """A digit with exactly two places in each of two rows, in the same columns, leaves those columns"""
+        cands = self.cands
+        for digit in DIGITS_OF[ALL_DIGITS]:
+            bit = 1 << digit
+            for lines, crosses in ((ROWS, COLS), (COLS, ROWS)):
+                wings = {}
+                for n, line in enumerate(lines):
+                    where = 0
+                    for k, i in enumerate(line):
+                        if cands[i] & bit:
+                            where |= 1 << k
+                    if bin(where).count('1') == 2:
+                        wings.setdefault(where, []).append(n)
+                for where, found in wings.items():
+                    if len(found) < 2:
+                        continue
+                    for a, b in combinations(found, 2):
+                        cells = [i for k in range(9) if where & (1 << k)
+                                 for n, i in enumerate(crosses[k]) if n != a and n != b]
+                        if self._eliminate(cells, bit):
+                            return 1
+        return 0
+
+
+def grade(board, max_level=None):
+    """Grade a 9x9 puzzle; see LogicalSolver.grade"""
+    return LogicalSolver(board).grade(max_level)
@@ -0,0 +1,138 @@
+"""
+In-process metrics in Prometheus text format
+
+Recording is a no-op until enable() is called, so the generator and solver
+can be instrumented unconditionally.
+"""
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds, and buckets for solver node counts
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+_lock = threading.Lock()
+_metrics = {}
+enabled = False
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        if not enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge(self, values):
+        for key, value in values.items():
+            self.values[key] = self.values.get(key, 0) + value
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, key, value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        if not enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def merge(self, values):
+        for key, series in values.items():
+            mine = self.values.get(key)
+            if mine is None:
+                self.values[key] = list(series)
+            else:
+                self.values[key] = [a + b for a, b in zip(mine, series)]
+
+    def samples(self):
+        for key, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                yield self.name + '_bucket', key + (('le', str(bound)),), cumulative
+            yield self.name + '_sum', key, series[-1]
+            yield self.name + '_count', key, cumulative
+
+
+def counter(name, help_text):
+    return _metrics.setdefault(name, Counter(name, help_text))
+
+
+def histogram(name, help_text, buckets=TIME_BUCKETS):
+    return _metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+
+def drain():
+    """
+    Take every recorded value, leaving the registry empty. A worker process returns
+    this with its result so the parent can merge() it into the registry it serves.
+    """
+    with _lock:
+        values = {name: metric.values for name, metric in _metrics.items() if metric.values}
+        for name in values:
+            _metrics[name].values = {}
+    return values
+
+
+def merge(values):
+    """Add values taken with drain() in another process"""
+    with _lock:
+        for name, series in values.items():
+            metric = _metrics.get(name)
+            if metric is not None:
+                metric.merge(series)
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for metric in _metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_text = ','.join(f'{key}="{val}"' for key, val in labels)
+                    lines.append(f'{name}{{{label_text}}} {value}')
+                else:
+                    lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+# Metrics shared between the app, the generator and the solver
+http_request_seconds = histogram('sudoku_http_request_duration_seconds', 'HTTP request latency by route')
+db_commit_seconds = histogram('sudoku_db_commit_duration_seconds', 'Database commit time')
+generation_stage_seconds = histogram('sudoku_generation_stage_duration_seconds', 'Puzzle generation time by stage')
+solver_nodes = histogram('sudoku_solver_nodes', 'Search nodes visited per count_solutions call', COUNT_BUCKETS)
+holes_attempted = counter('sudoku_dig_holes_attempted_total', 'Cells generate_puzzle tried to remove')
+holes_kept = counter('sudoku_dig_holes_kept_total', 'Cells generate_puzzle removed while keeping a unique solution')
+generation_boards = counter('sudoku_generation_boards_total', 'Complete boards dug to reach the requested difficulty tier')
@@ -4,12 +4,13 @@ Sudoku Flask Application Runner
 """
 import os
 import sys
-from app import app, db
+from app import app, fail_interrupted_jobs, init_db
 
 if __name__ == '__main__':
-    # Create database tables
+    # Create or migrate database tables (skipped when the schema version is current)
     with app.app_context():
-        db.create_all()
+        init_db()
+        fail_interrupted_jobs()
         print("Database initialized successfully!")
 
     # Run the application
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Production server for the Sudoku app (gunicorn)
+
+    python serve.py                                  # 127.0.0.1:5000, 2 workers x 4 threads
+    python serve.py --workers 4 --threads 8 --generation-processes 2
+
+The app is loaded and the database migrated once in the master process
+before the workers fork. Every option can also be set from the environment
+(SUDOKU_BIND, SUDOKU_WORKERS, SUDOKU_THREADS, GENERATION_PROCESSES).
+SIGTERM stops accepting connections and lets in-flight requests finish
+within --graceful-timeout seconds.
+"""
+import argparse
+import os
+
+from gunicorn.app.base import BaseApplication
+
+
+def on_starting(server):
+    """Create and migrate tables once, before any worker exists"""
+    from app import app, db, fail_interrupted_jobs, init_db
+
+    with app.app_context():
+        init_db()
+        # Only the server clears out jobs from its previous run; the CLI tools must not touch live ones
+        fail_interrupted_jobs()
+        # Workers must open their own SQLite connections rather than inherit the master's
+        db.engine.dispose()
+    server.log.info("Database initialized at %s", app.config['SQLALCHEMY_DATABASE_URI'])
+
+
+def worker_exit(server, worker):
+    """Stop background threads and generation processes when a worker shuts down"""
+    from app import generation_pool, job_executor, puzzle_pool
+
+    puzzle_pool.stop()
+    # Jobs still queued are dropped; on_starting marks them failed on the next start
+    job_executor.shutdown(wait=True, cancel_futures=True)
+    generation_pool.shutdown()
+
+
+class SudokuServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('on_starting', on_starting)
+        self.cfg.set('worker_exit', worker_exit)
+
+    def load(self):
+        from app import app
+        return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the Sudoku app with gunicorn')
+    parser.add_argument('--bind', default=os.environ.get('SUDOKU_BIND', '127.0.0.1:5000'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SUDOKU_WORKERS', 2)),
+                        help='Worker processes handling requests')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('SUDOKU_THREADS', 4)),
+                        help='Request threads per worker')
+    parser.add_argument('--generation-processes', type=int, default=int(os.environ.get('GENERATION_PROCESSES', 1)),
+                        help='Puzzle generation processes per worker (0 generates on the request thread)')
+    parser.add_argument('--timeout', type=int, default=60, help='Seconds before a silent worker is restarted')
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help='Seconds in-flight requests get to finish on shutdown')
+    args = parser.parse_args(argv)
+
+    # Read by create_sandstorm_app when the workers import the app
+    os.environ['GENERATION_PROCESSES'] = str(args.generation_processes)
+
+    SudokuServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        # Sandstorm grains can only write to /var, so there is nowhere for a control socket
+        'control_socket_disable': True,
+        'accesslog': '-'
+    }).run()
+
+
+if __name__ == '__main__':
+    main()
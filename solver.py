@@ -0,0 +1,226 @@
+"""
+Bitmask constraint-propagation Sudoku solver engine
+"""
+from units import BOX_OF, COL_OF, ROW_OF, UNITS
+
+# Digits 1-9 are stored as bits 1-9 of an int, so a digit's bit is simply 1 << digit
+ALL_DIGITS = 0x3FE
+
+# Lookup tables indexed by candidate mask
+POPCOUNT = [bin(mask).count('1') for mask in range(1 << 10)]
+DIGITS_OF = [tuple(d for d in range(1, 10) if mask & (1 << d)) for mask in range(1 << 10)]
+DIGIT_OF_BIT = {1 << d: d for d in range(1, 10)}
+
+
+class BitmaskSolver:
+    """
+    Sudoku solver keeping row/column/box occupancy bitmasks.
+    Searches the most constrained cell first (MRV) and propagates
+    naked and hidden singles at every node.
+    """
+
+    def __init__(self, grid=None):
+        self.cells = [0] * 81
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.solution = None
+        self.nodes = 0  # search nodes visited, for instrumentation
+        if grid is not None:
+            self.load(grid)
+
+    def load(self, grid):
+        """
+        Load a 9x9 grid (0 for empty cells).
+        Returns False if the givens already break a Sudoku rule.
+        """
+        self.cells = [0] * 81
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.solution = None
+        self.nodes = 0
+
+        consistent = True
+        for r in range(9):
+            row = grid[r]
+            for c in range(9):
+                value = row[c]
+                if not value:
+                    continue
+                if value not in DIGITS_OF[ALL_DIGITS]:
+                    consistent = False
+                    continue
+                bit = 1 << value
+                b = BOX_OF[r * 9 + c]
+                if (self.rows[r] | self.cols[c] | self.boxes[b]) & bit:
+                    consistent = False
+                    continue
+                self._place(r * 9 + c, value)
+        return consistent
+
+    def candidates(self, index):
+        """Candidate mask for an empty cell"""
+        return ALL_DIGITS & ~(self.rows[ROW_OF[index]] | self.cols[COL_OF[index]] | self.boxes[BOX_OF[index]])
+
+    def solve(self, rng=None):
+        """
+        Return one solution as a 9x9 grid, or None if there is none.
+        Pass a random.Random (or the random module) to randomize the search order.
+        """
+        if self._search(1, rng):
+            return self._to_grid(self.solution)
+        return None
+
+    def count_solutions(self, max_solutions=2):
+        """Count solutions, stopping as soon as max_solutions are found"""
+        return self._search(max_solutions, None)
+
+    def set_cell(self, index, digit):
+        """
+        Change one given of the loaded puzzle in place (0 empties it) without reloading the rest.
+        The caller keeps the givens consistent.
+        """
+        if self.cells[index]:
+            self._unplace(index)
+        if digit:
+            self._place(index, digit)
+        self.solution = None
+
+    def has_other_solution(self, index, digit):
+        """
+        Whether a solution puts something other than digit in the empty cell index.
+        When digit is that cell's value in a known solution, the puzzle is unique exactly
+        when this is False, and the search never revisits the known solution.
+        """
+        self.nodes = 0
+        for other in DIGITS_OF[self.candidates(index) & ~(1 << digit)]:
+            self._place(index, other)
+            found = self._search(1, None)
+            self._unplace(index)
+            if found:
+                return True
+        return False
+
+    def _place(self, index, digit):
+        bit = 1 << digit
+        self.cells[index] = digit
+        self.rows[ROW_OF[index]] |= bit
+        self.cols[COL_OF[index]] |= bit
+        self.boxes[BOX_OF[index]] |= bit
+
+    def _unplace(self, index):
+        bit = 1 << self.cells[index]
+        self.cells[index] = 0
+        self.rows[ROW_OF[index]] ^= bit
+        self.cols[COL_OF[index]] ^= bit
+        self.boxes[BOX_OF[index]] ^= bit
+
+    def _propagate(self, trail):
+        """
+        Fill naked and hidden singles until nothing changes.
+        Placed cells are appended to trail so the caller can undo them.
+        Returns False on a contradiction.
+        """
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+
+        while True:
+            changed = False
+
+            # Naked singles: cells with exactly one candidate
+            for i in range(81):
+                if cells[i]:
+                    continue
+                cand = ALL_DIGITS & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+                if not cand:
+                    return False
+                if not cand & (cand - 1):
+                    self._place(i, DIGIT_OF_BIT[cand])
+                    trail.append(i)
+                    changed = True
+
+            if changed:
+                continue
+
+            # Hidden singles: digits with exactly one possible cell in a unit
+            for unit in UNITS:
+                once = twice = placed = 0
+                for i in unit:
+                    if cells[i]:
+                        placed |= 1 << cells[i]
+                        continue
+                    cand = ALL_DIGITS & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+                    twice |= once & cand
+                    once |= cand
+
+                if (once | placed) != ALL_DIGITS:
+                    return False  # Some digit has nowhere to go in this unit
+
+                hidden = once & ~twice
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for i in unit:
+                        if not cells[i] and self.candidates(i) & bit:
+                            self._place(i, DIGIT_OF_BIT[bit])
+                            trail.append(i)
+                            changed = True
+                            break
+                    else:
+                        return False  # Another hidden single took the only cell
+
+            if not changed:
+                return True
+
+    def _search(self, limit, rng):
+        cells = self.cells
+        trail = []
+        self.nodes += 1
+
+        if not self._propagate(trail):
+            for i in trail:
+                self._unplace(i)
+            return 0
+
+        # Pick the empty cell with the fewest candidates (MRV)
+        best = -1
+        best_cand = 0
+        best_count = 10
+        for i in range(81):
+            if cells[i]:
+                continue
+            cand = self.candidates(i)
+            count = POPCOUNT[cand]
+            if count < best_count:
+                best, best_cand, best_count = i, cand, count
+                if count == 2:
+                    break
+
+        if best < 0:
+            # Every cell is filled: this is a solution
+            if self.solution is None:
+                self.solution = cells[:]
+            for i in trail:
+                self._unplace(i)
+            return 1
+
+        digits = DIGITS_OF[best_cand]
+        if rng is not None:
+            digits = list(digits)
+            rng.shuffle(digits)
+
+        found = 0
+        for digit in digits:
+            self._place(best, digit)
+            found += self._search(limit - found, rng)
+            self._unplace(best)
+            if found >= limit:
+                break
+
+        for i in trail:
+            self._unplace(i)
+        return found
+
+    @staticmethod
+    def _to_grid(cells):
+        return [cells[r * 9:r * 9 + 9] for r in range(9)]
@@ -6,10 +6,21 @@ class SandstormSudokuGame {
         this.difficulty = 'easy';
         this.timer = 0;
         this.timerInterval = null;
+        this.clockRunning = false;  // whether the server is counting play time for the current game
         this.isComplete = false;
         this.currentGameId = null;
         this.userHandle = 'Player';
 
+        // Moves are batched and sent to the server after a short pause
+        this.pendingMoves = [];
+        this.moveSeq = 0;
+        this.moveFlushTimer = null;
+        this.moveDebounceMs = 1000;
+
+        // New games are generated by a server job that is polled until done
+        this.jobPollMs = 300;
+        this.jobTimeoutMs = 120000;  // a job orphaned by a worker restart is never finished
+
         this.init();
     }
 
@@ -45,12 +56,16 @@ class SandstormSudokuGame {
 
     async loadExistingGame(gameData) {
         try {
+            await this.flushMoves();
+            await this.setClock('pause');
             this.currentGameId = gameData.id;
+            this.moveSeq = gameData.last_move_seq || 0;
             this.board = gameData.board_state;
             this.originalBoard = gameData.original_puzzle;
             this.difficulty = gameData.difficulty;
             this.timer = gameData.time_spent || 0;
             this.isComplete = gameData.is_complete;
+            this.clockRunning = false;
             this.selectedCell = null;
 
             if (gameData.user_handle) {
@@ -64,6 +79,7 @@ class SandstormSudokuGame {
             // Only start timer if game is not complete
             if (!this.isComplete) {
                 this.startTimer();
+                await this.setClock('resume');
             }
 
             this.loadSavedGames();
@@ -140,6 +156,21 @@ class SandstormSudokuGame {
             this.hideModal();
         });
 
+        // Send any batched moves before the page goes away
+        window.addEventListener('pagehide', () => {
+            this.flushMoves(true);
+        });
+
+        // Stop the server's clock while the game is out of sight
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') {
+                this.flushMoves(true);
+                this.setClock('pause', true);
+            } else if (document.getElementById('game-board-screen').style.display !== 'none') {
+                this.setClock('resume');
+            }
+        });
+
         // Keyboard input
         document.addEventListener('keydown', (e) => {
             if (this.selectedCell) {
@@ -157,22 +188,29 @@ class SandstormSudokuGame {
 
     async startNewGame() {
         try {
+            await this.flushMoves();
+            await this.setClock('pause');
             const response = await fetch('/api/new-game', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({ difficulty: this.difficulty })
+                body: JSON.stringify({ difficulty: this.difficulty, async: true })
             });
 
-            const data = await response.json();
+            let data = await response.json();
+            if (data.success && data.job_id) {
+                data = await this.waitForJob(data.job_id);
+            }
             if (data.success) {
                 this.currentGameId = data.game_id;
+                this.moveSeq = 0;
                 this.board = data.puzzle;
                 this.originalBoard = JSON.parse(JSON.stringify(data.puzzle));
                 this.difficulty = data.difficulty;
                 this.timer = 0;
                 this.isComplete = false;
+                this.clockRunning = true;  // the server starts the clock when it creates the game
                 this.selectedCell = null;
 
                 if (data.user_handle) {
@@ -194,6 +232,30 @@ class SandstormSudokuGame {
         }
     }
 
+    async waitForJob(jobId) {
+        // Poll an async new-game job until the server has generated the puzzle
+        let notified = false;
+        const deadline = Date.now() + this.jobTimeoutMs;
+        for (let polls = 0; ; polls++) {
+            if (Date.now() > deadline) {
+                return { success: false, error: 'Timed out waiting for the puzzle' };
+            }
+            const response = await fetch(`/api/jobs/${jobId}`);
+            const data = await response.json();
+            if (!data.success || data.status === 'done') {
+                return data;
+            }
+            if (data.status === 'failed') {
+                return { success: false, error: data.error };
+            }
+            if (polls >= 3 && !notified) {
+                this.showMessage('Generating your puzzle...', 'info');
+                notified = true;
+            }
+            await new Promise(resolve => setTimeout(resolve, this.jobPollMs));
+        }
+    }
+
     async loadGame(gameId) {
         try {
             const response = await fetch(`/api/game/${gameId}`);
@@ -211,10 +273,12 @@ class SandstormSudokuGame {
         }
     }
 
-    async saveGame() {
+    async saveGame(silent = false) {
         if (!this.currentGameId) return;
 
         try {
+            await this.flushMoves();
+
             const response = await fetch(`/api/game/${this.currentGameId}`, {
                 method: 'PUT',
                 headers: {
@@ -222,14 +286,15 @@ class SandstormSudokuGame {
                 },
                 body: JSON.stringify({
                     board_state: this.board,
-                    time_spent: this.timer,
                     is_complete: this.isComplete
                 })
             });
 
             const data = await response.json();
             if (data.success) {
-                this.showMessage('Game saved successfully!', 'success');
+                if (!silent) {
+                    this.showMessage('Game saved successfully!', 'success');
+                }
                 this.loadSavedGames();
             } else {
                 console.error('Failed to save game:', data.error);
@@ -241,6 +306,90 @@ class SandstormSudokuGame {
         }
     }
 
+    queueMove(row, col, value) {
+        this.pendingMoves.push([row, col, value, Date.now()]);
+        if (!this.moveFlushTimer) {
+            this.moveFlushTimer = setTimeout(() => this.flushMoves(), this.moveDebounceMs);
+        }
+    }
+
+    async flushMoves(keepalive = false) {
+        if (this.moveFlushTimer) {
+            clearTimeout(this.moveFlushTimer);
+            this.moveFlushTimer = null;
+        }
+        if (!this.currentGameId || this.pendingMoves.length === 0) return;
+
+        const moves = this.pendingMoves;
+        this.pendingMoves = [];
+        this.moveSeq++;
+
+        try {
+            const response = await fetch(`/api/game/${this.currentGameId}/moves`, {
+                method: 'PATCH',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    seq: this.moveSeq,
+                    moves: moves
+                }),
+                keepalive: keepalive
+            });
+
+            const data = await response.json();
+            if (response.status === 409 && data.is_complete) {
+                // Completed elsewhere (e.g. another tab): the server takes no more moves for it
+                this.isComplete = true;
+                this.clockRunning = false;
+                this.stopTimer();
+            } else if (response.status === 409) {
+                // Out of sync with the server (e.g. another tab): resync and send the whole board
+                this.moveSeq = data.seq;
+                await this.saveGame(true);
+            } else if (!data.success) {
+                console.error('Failed to save moves:', data.error);
+            } else if (data.completed) {
+                // The server completed the game, so later saves must not send is_complete: false
+                this.isComplete = true;
+                this.clockRunning = false;
+                this.timer = data.time_spent;
+                this.stopTimer();
+                this.updateTimerDisplay();
+            }
+        } catch (error) {
+            // Keep the moves and retry them with the next batch
+            console.error('Error saving moves:', error);
+            this.pendingMoves = moves.concat(this.pendingMoves);
+        }
+    }
+
+    async setClock(kind, keepalive = false) {
+        // Play time is derived on the server from logged events; the local timer only displays it
+        const running = kind === 'resume';
+        if (!this.currentGameId || this.isComplete || this.clockRunning === running) return;
+        this.clockRunning = running;
+
+        try {
+            const response = await fetch(`/api/game/${this.currentGameId}/events`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ kind: kind }),
+                keepalive: keepalive
+            });
+
+            const data = await response.json();
+            if (data.success && running) {
+                this.timer = data.time_spent;
+                this.updateTimerDisplay();
+            }
+        } catch (error) {
+            console.error('Error recording clock event:', error);
+        }
+    }
+
     async validateBoard() {
         try {
             const response = await fetch('/api/validate', {
@@ -255,6 +404,7 @@ class SandstormSudokuGame {
             if (data.success) {
                 if (data.is_complete) {
                     this.isComplete = true;
+                    this.clockRunning = false;
                     this.stopTimer();
                     this.saveGame();
                     this.showCompletionModal();
@@ -271,26 +421,31 @@ class SandstormSudokuGame {
         }
     }
 
-    async loadSavedGames() {
+    async loadSavedGames(cursor = null) {
         try {
-            const response = await fetch('/api/games');
+            const url = cursor ? `/api/games?cursor=${encodeURIComponent(cursor)}` : '/api/games';
+            const response = await fetch(url);
             const data = await response.json();
 
             if (data.success) {
-                this.displaySavedGames(data.games);
+                this.displaySavedGames(data.games, data.next_cursor, cursor !== null);
             }
         } catch (error) {
             console.error('Error loading saved games:', error);
         }
     }
 
-    displaySavedGames(games) {
+    displaySavedGames(games, nextCursor = null, append = false) {
         const container = document.getElementById('saved-games-list');
         if (!container) return;
 
-        container.innerHTML = '';
+        if (append) {
+            container.querySelector('.load-more-games')?.remove();
+        } else {
+            container.innerHTML = '';
+        }
 
-        if (games.length === 0) {
+        if (games.length === 0 && !append) {
             container.innerHTML = '<p style="text-align: center; color: #666;">No saved games</p>';
             return;
         }
@@ -322,6 +477,16 @@ class SandstormSudokuGame {
 
             container.appendChild(gameItem);
         });
+
+        if (nextCursor) {
+            const loadMore = document.createElement('button');
+            loadMore.className = 'btn btn--secondary load-more-games';
+            loadMore.textContent = 'Load more';
+            loadMore.addEventListener('click', () => {
+                this.loadSavedGames(nextCursor);
+            });
+            container.appendChild(loadMore);
+        }
     }
 
     showGameBoard() {
@@ -333,6 +498,7 @@ class SandstormSudokuGame {
         document.getElementById('difficulty-selection').style.display = 'block';
         document.getElementById('game-board-screen').style.display = 'none';
         this.stopTimer();
+        this.setClock('pause');
     }
 
     createBoard() {
@@ -373,9 +539,9 @@ class SandstormSudokuGame {
         this.board[row][col] = number;
         this.updateBoard();
 
-        // Auto-save after each move
+        // Auto-save: moves are batched over a short debounce window
         if (this.currentGameId) {
-            this.saveGame();
+            this.queueMove(row, col, number);
         }
     }
 
@@ -455,7 +621,7 @@ class SandstormSudokuGame {
         this.updateTimerDisplay();
     }
 
-    showHint() {
+    async showHint() {
         if (!this.selectedCell) {
             this.showMessage('Please select a cell first.', 'info');
             return;
@@ -467,7 +633,28 @@ class SandstormSudokuGame {
             return;
         }
 
-        // Simple hint: find valid numbers for the selected cell
+        if (this.currentGameId) {
+            try {
+                const response = await fetch(`/api/game/${this.currentGameId}/hint?row=${row}&col=${col}`);
+                const data = await response.json();
+
+                if (data.success) {
+                    // Compare locally: the board on screen may be ahead of the last save
+                    if (this.board[row][col] === data.value) {
+                        this.showMessage(`${data.value} is correct for this cell.`, 'success');
+                    } else if (this.board[row][col]) {
+                        this.showMessage(`Hint: ${this.board[row][col]} is wrong here, try ${data.value}.`, 'warning');
+                    } else {
+                        this.showMessage(`Hint: This cell is ${data.value}.`, 'info');
+                    }
+                    return;
+                }
+            } catch (error) {
+                console.error('Error fetching hint:', error);
+            }
+        }
+
+        // Fallback hint: find valid numbers for the selected cell
         const validNumbers = [];
         for (let num = 1; num <= 9; num++) {
             if (this.isValidMove(row, col, num)) {
@@ -0,0 +1,108 @@
+"""
+SQLite tuning and write batching
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Applied to every new connection. WAL lets readers run alongside the writer,
+# and synchronous=NORMAL only syncs at checkpoints instead of on every commit.
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 5000),  # ms to wait for a lock instead of failing with "database is locked"
+    ('mmap_size', 256 * 1024 * 1024),
+    ('cache_size', -16000),  # negative means KiB, so 16 MB
+    ('temp_store', 'MEMORY'),
+)
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """SQLAlchemy 'connect' event handler"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+class GroupCommitWriter:
+    """
+    Runs write jobs from many request threads on one writer thread and
+    commits every job that arrives within a short window as one transaction.
+
+    A job is a callable taking the session; it may issue several statements.
+    Each job runs in its own savepoint, so one that fails is rolled back on its
+    own and the rest of the batch still commits. submit() blocks until the batch
+    holding it has committed and returns the job's result (or raises its error).
+    """
+
+    def __init__(self, app, db, window_ms=5, max_batch=200):
+        self.app = app
+        self.db = db
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.batches = 0
+        self.jobs = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, job):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((job, future))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+                    self._thread.start()
+
+    def _collect(self):
+        """Block for the first job, then gather whatever else arrives within the window"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            with self.app.app_context():
+                session = self.db.session
+                results = []
+                try:
+                    for job, future in batch:
+                        # Leaving the savepoint with an error rolls back only this job's statements
+                        try:
+                            with session.begin_nested():
+                                result = job(session)
+                            results.append((future, result, None))
+                        except Exception as e:
+                            results.append((future, None, e))
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    results = [(future, None, e) for job, future in batch]
+                finally:
+                    self.db.session.remove()
+
+            self.batches += 1
+            self.jobs += len(batch)
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
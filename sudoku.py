@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Sudoku command line tools
+
+    python -m sudoku generate --difficulty hard --count 10000 --workers 4 --output hard.ndjson
+    python -m sudoku generate --difficulty easy --count 500 --into pool
+    python -m sudoku seeds --count 50 --seed 20240101 --output seed_corpus.txt
+    python -m sudoku export --user-id <id> --output games.ndjson
+    python -m sudoku import --user-id <id> games.ndjson
+    python -m sudoku rebuild-stats
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from codec import board_to_string
+from generator import SudokuGenerator
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def _generate_chunk(difficulty, seeds):
+    """Worker task: generate one (puzzle, solution, grade) triple per seed, each with its own RNG"""
+    started = time.perf_counter()
+    puzzles = []
+    for seed in seeds:
+        generator = SudokuGenerator(rng=random.Random(seed))
+        puzzle, solution = generator.generate_puzzle(difficulty)
+        puzzles.append((puzzle, solution, generator.last_grade))
+    return puzzles, time.perf_counter() - started, os.getpid()
+
+
+def generate_batch(difficulty, count, workers=None, seed=None, chunk_size=50):
+    """
+    Generate puzzles across a process pool.
+    Yields (puzzles, busy_seconds, worker_pid) per finished chunk, in completion order.
+    Every puzzle gets its own seed derived from seed, so a seeded run gives the same
+    puzzles however they are split into chunks.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Small runs still get spread over every worker
+    chunk_size = min(chunk_size, max(1, math.ceil(count / workers)))
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(count)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_generate_chunk, difficulty, seeds[start:start + chunk_size])
+                   for start in range(0, count, chunk_size)]
+
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class FileSink:
+    """Write puzzles as NDJSON lines"""
+
+    def __init__(self, path, difficulty):
+        self.file = sys.stdout if path == '-' else open(path, 'w')
+        self.difficulty = difficulty
+
+    def write(self, puzzles):
+        for puzzle, solution, graded in puzzles:
+            self.file.write(json.dumps({
+                'difficulty': self.difficulty,
+                'puzzle': board_to_string(puzzle),
+                'solution': board_to_string(solution),
+                'score': graded.score
+            }) + '\n')
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class DatabaseSink:
+    """Bulk insert puzzles into the puzzle pool or as new games for a user"""
+
+    def __init__(self, table, difficulty, user_id=None):
+        from app import app, db, init_db, record_games_started, PooledPuzzle, SudokuGame
+
+        self.app = app
+        self.record_games_started = record_games_started
+        self.db = db
+        self.model = PooledPuzzle if table == 'pool' else SudokuGame
+        self.difficulty = difficulty
+        self.user_id = user_id
+        with app.app_context():
+            init_db()
+
+    def write(self, puzzles):
+        if self.model.__tablename__ == 'pooled_puzzle':
+            rows = [
+                {'difficulty': self.difficulty, 'puzzle': board_to_string(puzzle), 'solution': board_to_string(solution),
+                 'score': graded.score}
+                for puzzle, solution, graded in puzzles
+            ]
+        else:
+            rows = [
+                {
+                    'sandstorm_user_id': self.user_id,
+                    'user_handle': self.user_id,
+                    'board_state': board_to_string(puzzle),
+                    'original_puzzle': board_to_string(puzzle),
+                    'solution': board_to_string(solution),
+                    'difficulty': self.difficulty,
+                    'score': graded.score
+                }
+                for puzzle, solution, graded in puzzles
+            ]
+
+        # One executemany INSERT and one commit per chunk
+        with self.app.app_context():
+            self.db.session.execute(self.db.insert(self.model), rows)
+            if self.user_id:
+                self.record_games_started(self.db.session, self.user_id, len(rows))
+            self.db.session.commit()
+
+    def close(self):
+        pass
+
+
+def cmd_generate(args):
+    if args.into == 'games' and not args.user_id:
+        print("--user-id is required with --into games", file=sys.stderr)
+        return 2
+
+    workers = args.workers or os.cpu_count() or 1
+    if args.into:
+        sink = DatabaseSink(args.into, args.difficulty, args.user_id)
+    else:
+        sink = FileSink(args.output, args.difficulty)
+
+    generated = 0
+    busy = 0.0
+    pids = set()
+    started = time.perf_counter()
+    try:
+        for puzzles, busy_seconds, pid in generate_batch(args.difficulty, args.count, workers,
+                                                         args.seed, args.chunk_size):
+            sink.write(puzzles)
+            generated += len(puzzles)
+            busy += busy_seconds
+            pids.add(pid)
+            print(f"  {generated}/{args.count} puzzles", file=sys.stderr)
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - started
+
+    # Per-core throughput from worker busy time vs. what the pool actually delivered
+    per_core = generated / busy if busy else 0.0
+    overall = generated / elapsed if elapsed else 0.0
+    efficiency = overall / (per_core * workers) if per_core else 0.0
+    print(f"Generated {generated} {args.difficulty} puzzles in {elapsed:.2f}s "
+          f"with {workers} workers ({len(pids)} processes used)", file=sys.stderr)
+    print(f"  {overall:.1f} puzzles/sec overall, {per_core:.1f} puzzles/sec per core, "
+          f"{efficiency:.0%} scaling efficiency", file=sys.stderr)
+    return 0
+
+
+def cmd_seeds(args):
+    """Write a graded seed corpus for transform-mode generation (see transforms.py)"""
+    seeds = random.Random(args.seed)
+    lines = []
+    for difficulty in DIFFICULTIES:
+        low, high = SudokuGenerator.DIFFICULTY_PARAMS[difficulty]['levels']
+        found = 0
+        # generate_puzzle can fall back to an out-of-tier puzzle; those never become seeds
+        while found < args.count:
+            for puzzles, _, _ in generate_batch(difficulty, args.count - found, args.workers, seeds.getrandbits(64)):
+                for puzzle, solution, graded in puzzles:
+                    if low <= graded.level <= high:
+                        lines.append(f"{difficulty} {graded.score} {board_to_string(puzzle)} {board_to_string(solution)}")
+                        found += 1
+        print(f"  {found} {difficulty} seeds", file=sys.stderr)
+
+    # Sorted so regenerating with the same seed gives the same file whatever the worker count
+    lines.sort(key=lambda line: (DIFFICULTIES.index(line.split()[0]), line))
+    with open(args.output, 'w') as f:
+        f.write("# Graded seed corpus: <difficulty> <grader score> <81 digit puzzle> <81 digit solution>\n")
+        f.write(f"# Generated with python -m sudoku seeds --count {args.count} --seed {args.seed}\n")
+        f.write('\n'.join(lines) + '\n')
+    return 0
+
+
+def cmd_export(args):
+    """Write a user's games as NDJSON, streamed from the database"""
+    from app import app, export_games, init_db
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        with app.app_context():
+            init_db()
+            for chunk in export_games(args.user_id):
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def cmd_import(args):
+    """Insert games from an NDJSON export for a user, in batched transactions"""
+    from app import app, import_games, init_db
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        with app.app_context():
+            init_db()
+            result = import_games(args.user_id, source, args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"Imported {result['imported']} games, rejected {result['rejected']} lines", file=sys.stderr)
+    for error in result['errors']:
+        print(f"  line {error['line']}: {error['error']}", file=sys.stderr)
+    return 1 if result['rejected'] else 0
+
+
+def cmd_rebuild_stats(args):
+    """Recompute the UserStats table from games and their event logs"""
+    from app import app, init_db, rebuild_user_stats
+
+    with app.app_context():
+        init_db()
+        users = rebuild_user_stats(args.user_id)
+    print(f"Rebuilt stats for {users} users", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m sudoku', description='Sudoku command line tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Generate puzzles in parallel')
+    generate.add_argument('--difficulty', choices=DIFFICULTIES, default='medium')
+    generate.add_argument('--count', type=int, default=100)
+    generate.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    generate.add_argument('--seed', type=int, default=None, help='Base seed for reproducible batches')
+    generate.add_argument('--chunk-size', type=int, default=50, help='Puzzles per worker task')
+    generate.add_argument('--output', default='-', help='NDJSON output file (default: stdout)')
+    generate.add_argument('--into', choices=('pool', 'games'), help='Insert into a database table instead')
+    generate.add_argument('--user-id', help='Sandstorm user id owning the games (with --into games)')
+    generate.set_defaults(func=cmd_generate)
+
+    seeds = commands.add_parser('seeds', help='Build the graded seed corpus used by transform generation')
+    seeds.add_argument('--count', type=int, default=50, help='Seeds per difficulty')
+    seeds.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    seeds.add_argument('--seed', type=int, default=None, help='Base seed for a reproducible corpus')
+    seeds.add_argument('--output', default='seed_corpus.txt')
+    seeds.set_defaults(func=cmd_seeds)
+
+    export = commands.add_parser('export', help="Export a user's games as NDJSON")
+    export.add_argument('--user-id', required=True, help='Sandstorm user id whose games to export')
+    export.add_argument('--output', default='-', help='NDJSON output file (default: stdout)')
+    export.set_defaults(func=cmd_export)
+
+    import_ = commands.add_parser('import', help='Import games from an NDJSON export')
+    import_.add_argument('input', nargs='?', default='-', help='NDJSON file (default: stdin)')
+    import_.add_argument('--user-id', required=True, help='Sandstorm user id that will own the games')
+    import_.add_argument('--batch-size', type=int, default=1000, help='Games per transaction')
+    import_.set_defaults(func=cmd_import)
+
+    rebuild_stats = commands.add_parser('rebuild-stats', help='Recompute per-user stats from existing games')
+    rebuild_stats.add_argument('--user-id', help='Only rebuild this Sandstorm user (default: everyone)')
+    rebuild_stats.set_defaults(func=cmd_rebuild_stats)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
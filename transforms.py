@@ -0,0 +1,113 @@
+"""
+Deriving new puzzles from graded seeds with validity-preserving transforms
+
+Relabeling digits, permuting rows within a band, columns within a stack, bands,
+stacks, and transposing all map a valid Sudoku to a valid Sudoku with the same
+number of solutions and the same grader level (though not always the same
+score, which depends on the order steps are found in). Together they give
+9! * 1296 * 1296 * 2 (about 1.2 trillion) variants of every seed.
+"""
+import os
+import random
+from collections import namedtuple
+
+from codec import is_board_string
+
+SEED_CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed_corpus.txt')
+
+# digits: the new label of 1-9 in order; rows and cols: the source line of each new line
+Transform = namedtuple('Transform', ['transpose', 'digits', 'rows', 'cols'])
+IDENTITY = Transform(False, '123456789', tuple(range(9)), tuple(range(9)))
+
+Seed = namedtuple('Seed', ['difficulty', 'score', 'puzzle', 'solution'])
+# score is the seed's grader score; the derived puzzle's own score can differ
+Derived = namedtuple('Derived', ['puzzle', 'solution', 'seed', 'transform', 'score'])
+
+
+def random_transform(rng=random):
+    """A uniformly random transform"""
+    def line_order():
+        return tuple(band * 3 + line for band in rng.sample(range(3), 3) for line in rng.sample(range(3), 3))
+
+    return Transform(rng.random() < 0.5, ''.join(rng.sample('123456789', 9)), line_order(), line_order())
+
+
+def apply_transform(board, transform):
+    """Transform an 81 digit board string"""
+    rows, cols = transform.rows, transform.cols
+    if transform.transpose:
+        cells = [board[cols[c] * 9 + rows[r]] for r in range(9) for c in range(9)]
+    else:
+        cells = [board[rows[r] * 9 + cols[c]] for r in range(9) for c in range(9)]
+    return ''.join(cells).translate(str.maketrans('123456789', transform.digits))
+
+
+def encode_transform(transform):
+    """28 character text form: T or N, the digit labels, then row and column orders"""
+    return (('T' if transform.transpose else 'N') + transform.digits +
+            ''.join(map(str, transform.rows)) + ''.join(map(str, transform.cols)))
+
+
+def decode_transform(text):
+    """Parse encode_transform output, raising ValueError if it is not a valid transform"""
+    if not isinstance(text, str) or len(text) != 28 or text[0] not in 'TN':
+        raise ValueError('Transform must be 28 characters starting with T or N')
+    digits, rows, cols = text[1:10], text[10:19], text[19:28]
+    if sorted(digits) != list('123456789'):
+        raise ValueError('Transform digits must relabel 1-9')
+    orders = []
+    for order in (rows, cols):
+        if not order.isdigit() or sorted(order) != list('012345678'):
+            raise ValueError('Transform row and column orders must permute 0-8')
+        order = tuple(int(line) for line in order)
+        # Lines may only move within their band, and bands only as a whole
+        for band in range(3):
+            if len({line // 3 for line in order[band * 3:band * 3 + 3]}) != 1:
+                raise ValueError('Transform must keep lines within bands')
+        orders.append(order)
+    return Transform(text[0] == 'T', digits, orders[0], orders[1])
+
+
+class SeedCorpus:
+    """Graded seed puzzles per difficulty, read from seed_corpus.txt"""
+
+    def __init__(self, seeds=()):
+        self.by_difficulty = {}
+        self.by_puzzle = {}
+        for seed in seeds:
+            self.by_difficulty.setdefault(seed.difficulty, []).append(seed)
+            self.by_puzzle[seed.puzzle] = seed
+
+    @classmethod
+    def load(cls, path=SEED_CORPUS_PATH):
+        """Lines of <difficulty> <score> <puzzle> <solution>; a missing file gives an empty corpus"""
+        seeds = []
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip() and not line.startswith('#'):
+                        difficulty, score, puzzle, solution = line.split()
+                        if not (is_board_string(puzzle) and is_board_string(solution)):
+                            raise ValueError(f'Bad seed corpus line: {line.strip()}')
+                        seeds.append(Seed(difficulty, int(score), puzzle, solution))
+        return cls(seeds)
+
+    def __len__(self):
+        return len(self.by_puzzle)
+
+    def derive(self, difficulty, rng=random):
+        """A random variant of a random seed of this difficulty, or None if there are no such seeds"""
+        seeds = self.by_difficulty.get(difficulty)
+        if not seeds:
+            return None
+        seed = rng.choice(seeds)
+        transform = random_transform(rng)
+        return Derived(apply_transform(seed.puzzle, transform), apply_transform(seed.solution, transform),
+                       seed.puzzle, encode_transform(transform), seed.score)
+
+    def rebuild_solution(self, seed_puzzle, transform_text):
+        """The solution of a derived puzzle from its recorded seed and transform, or None for an unknown seed"""
+        seed = self.by_puzzle.get(seed_puzzle)
+        if seed is None:
+            return None
+        return apply_transform(seed.solution, decode_transform(transform_text))
@@ -0,0 +1,14 @@
+"""
+Sudoku grid geometry shared by the board tracker and the solvers
+"""
+
+ROW_OF = [i // 9 for i in range(81)]
+COL_OF = [i % 9 for i in range(81)]
+BOX_OF = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+
+# The 27 units (9 rows, 9 columns, 9 boxes) as lists of flat cell indices
+UNITS = (
+    [[r * 9 + c for c in range(9)] for r in range(9)] +
+    [[r * 9 + c for r in range(9)] for c in range(9)] +
+    [[(b // 3) * 27 + (b % 3) * 3 + i * 9 + j for i in range(3) for j in range(3)] for b in range(9)]
+)